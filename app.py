@@ -2,10 +2,22 @@ import streamlit as st
 import pandas as pd
 import io
 import os
-import re
 import datetime
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
+
+from cache import cache_global, hash_konten
+from cleaning import FORMAT_KOLOM, baca_preview, bersihkan_file
+from diagnostik import LogTahap, ke_jsonl, ukur
+from export import (FORMAT_DOWNLOAD, MIME, SHEET_CLEANING, SHEET_FIFO, format_cleaning, format_fifo,
+                    siapkan_download, tulis_parquet)
+from fifo_engine import kolom_dipakai, run_fifo_ringkas, validasi_mapping
+from ingest import FORMAT_DIDUKUNG, baca_tabel
+from jobs import DIBATALKAN, GAGAL, SELESAI, jalankan
+from penyimpanan import JENIS_DATA, penyimpanan_global, periode_default
+from posisi_stok import FREKUENSI, NILAI_MATRIKS, IndeksStok, daftar_tanggal
+from pengaturan_kolom import PengaturanKolom
+from resep import baca_resep, buat_resep, resep_ke_json
+from tampilan import (UKURAN_HALAMAN, ambil_halaman, filter_ledger, format_tampilan_cleaning, format_tampilan_fifo,
+                      format_tampilan_matriks, jumlah_halaman, ringkasan_produk)
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(page_title="FIFO Master", layout="wide")
@@ -25,14 +37,197 @@ def format_indonesia(value, fmt_type):
         return value
     except: return value
 
+# Catatan diagnostik disimpan per sesi (run terbaru di atas), dibatasi supaya tidak terus membesar
+MAX_LOG_DIAGNOSTIK = 500
+
+def simpan_log(log):
+    riwayat = st.session_state.setdefault('log_diagnostik', [])
+    riwayat[:0] = log.catatan
+    del riwayat[MAX_LOG_DIAGNOSTIK:]
+
+def tampilkan_diagnostik(tab):
+    riwayat = [rec for rec in st.session_state.get('log_diagnostik', []) if rec['tab'] == tab]
+    if not riwayat:
+        return
+    with st.expander(f"🩺 Diagnostik Performa ({tab})"):
+        terakhir = riwayat[0]['run_id']
+        df_log = pd.DataFrame(riwayat)
+        st.caption(f"Run terakhir: {terakhir} — total {df_log.loc[df_log['run_id'] == terakhir, 'detik'].sum():.2f} detik")
+        st.dataframe(df_log[df_log['run_id'] == terakhir].drop(columns=['run_id', 'tab']), hide_index=True)
+        st.download_button(
+            label=f"📥 Download Log Diagnostik ({df_log['run_id'].nunique()} run, JSON Lines)",
+            data=ke_jsonl(reversed(riwayat)),
+            file_name=f"diagnostik_{tab.lower()}.jsonl",
+            mime="application/jsonl",
+            key=f"dl_log_{tab}"
+        )
+
+def tampilkan_ledger(hasil):
+    # Ledger tetap numerik di session_state; hanya halaman aktif yang diformat & dikirim ke browser
+    ledger = hasil['ledger']
+    df_final = ledger.df
+    f1, f2 = st.columns(2)
+    with f1:
+        produk = st.multiselect("Filter Produk", hasil['opsi_produk'], key="v_produk")
+    with f2:
+        keterangan = st.multiselect("Filter Keterangan", hasil['opsi_keterangan'], key="v_ket")
+
+    kunci_filter = (hasil['id'], tuple(produk), tuple(keterangan))
+    if st.session_state.get('v_kunci_filter') != kunci_filter:
+        st.session_state['v_kunci_filter'] = kunci_filter
+        st.session_state['v_filtered'] = filter_ledger(df_final, produk, keterangan)
+        st.session_state['v_hal'] = 1
+    df_view = st.session_state['v_filtered']
+
+    p1, p2 = st.columns(2)
+    with p1:
+        ukuran = st.selectbox("Baris per halaman", UKURAN_HALAMAN, index=1, key="v_ukuran")
+    n_hal = jumlah_halaman(len(df_view), ukuran)
+    if st.session_state.get('v_hal', 1) > n_hal:
+        st.session_state['v_hal'] = 1
+    with p2:
+        hal = st.number_input(f"Halaman (dari {n_hal:,})", min_value=1, max_value=n_hal, key="v_hal")
+    st.caption(f"{len(df_view):,} dari {len(df_final):,} baris — halaman {hal:,} dari {n_hal:,}")
+    st.dataframe(format_tampilan_fifo(ledger.lengkap(ambil_halaman(df_view, hal, ukuran))), hide_index=True)
+
+    with st.expander("📊 Ringkasan per Produk (Stok & Nilai Stok Akhir)"):
+        ringkasan = hasil['ringkasan']
+        if produk:
+            ringkasan = ringkasan[ringkasan['Produk'].isin(produk)]
+        st.dataframe(format_tampilan_fifo(ringkasan), hide_index=True)
+
+def tampilkan_posisi_stok(hasil):
+    # Posisi stok as-of per tanggal dari indeks (binary search per produk), bukan dari ledger penuh.
+    # Body expander tetap jalan tiap rerun walau tertutup: matriks hanya dihitung saat form dikirim
+    # dan disimpan di session_state per (job, tanggal, produk, nilai); yang diformat hanya halaman aktif.
+    indeks = hasil['indeks']
+    with st.expander("📅 Posisi Stok & Nilai per Tanggal"):
+        awal, akhir = hasil['rentang']
+        with st.form("ps_form"):
+            q1, q2, q3, q4 = st.columns(4)
+            with q1: mulai = st.date_input("Dari Tanggal", value=awal, key="ps_mulai")
+            with q2: sampai = st.date_input("Sampai Tanggal", value=akhir, key="ps_sampai")
+            with q3: frekuensi = st.selectbox("Posisi per", list(FREKUENSI), key="ps_frek")
+            with q4: nilai = st.selectbox("Nilai", NILAI_MATRIKS, key="ps_nilai")
+            produk = st.multiselect("Produk (kosong = semua produk)", hasil['opsi_produk'], key="ps_produk")
+            kirim = st.form_submit_button("📅 Hitung Posisi Stok")
+
+        if kirim:
+            tanggal = daftar_tanggal(mulai, sampai, frekuensi)
+            kunci = (hasil['id'], tuple(tanggal), tuple(produk), nilai)
+            if not tanggal:
+                st.session_state.pop('ps_hasil', None)
+                st.info("Tidak ada tanggal di rentang tersebut.")
+            elif st.session_state.get('ps_hasil', {}).get('kunci') != kunci:
+                st.session_state['ps_hasil'] = {
+                    'kunci': kunci, 'nilai': nilai, 'n_tanggal': len(tanggal),
+                    'matriks': indeks.matriks(tanggal, produk or None, nilai), 'file': None}
+                st.session_state['ps_hal'] = 1
+
+        ps = st.session_state.get('ps_hasil')
+        if ps and ps['kunci'][0] == hasil['id']:
+            matriks = ps['matriks']
+            p1, p2 = st.columns(2)
+            with p1:
+                ukuran = st.selectbox("Baris per halaman", UKURAN_HALAMAN, index=1, key="ps_ukuran")
+            n_hal = jumlah_halaman(len(matriks), ukuran)
+            if st.session_state.get('ps_hal', 1) > n_hal:
+                st.session_state['ps_hal'] = 1
+            with p2:
+                hal = st.number_input(f"Halaman (dari {n_hal:,})", min_value=1, max_value=n_hal, key="ps_hal")
+            st.caption(f"{ps['nilai']} akhir hari pada {ps['n_tanggal']} tanggal untuk {len(matriks):,} produk "
+                       f"— halaman {hal:,} dari {n_hal:,}")
+            st.dataframe(format_tampilan_matriks(ambil_halaman(matriks, hal, ukuran), ps['nilai']), hide_index=True)
+
+            jenis = hasil['download'][3]
+            if ps['file'] is None:
+                if st.button(f"📄 Siapkan File Posisi Stok ({jenis})", key="ps_siapkan"):
+                    df_matriks = matriks.copy()
+                    df_matriks.columns = [c.strftime('%d/%m/%Y') for c in df_matriks.columns]
+                    fmt = '#,##0' if ps['nilai'] == 'Stok' else '"Rp" #,##0.00'
+                    ps['file'] = siapkan_download(df_matriks.reset_index(), jenis, [None] + [fmt] * ps['n_tanggal'],
+                                                  "Posisi_Stok", "posisi_stok")
+            if ps['file'] is not None:
+                data_m, nama_m, mime_m = ps['file']
+                st.download_button(label=f"📥 Download Posisi Stok ({jenis})", data=data_m, file_name=nama_m,
+                                   mime=mime_m)
+
+        st.download_button(label="📥 Download Indeks Posisi Stok (Parquet)", data=hasil['indeks_parquet'],
+                           file_name="indeks_posisi_stok.parquet", mime=MIME["Parquet"])
+
+def job_fifo(job, so, masuk, keluar, mapping, opt_configs, snapshot, jenis_download, log):
+    # Dijalankan di thread job: hanya menulis ke `job`, tidak memanggil st.* / session_state
+    job.lapor("Membaca data...", 0.0)
+    with ukur(log, 'baca_data') as t:
+        # Sumber dari Penyimpanan Data berupa fungsi pembaca; dibaca di sini, bukan di rerun UI
+        so, masuk, keluar = [x() if callable(x) else x for x in (so, masuk, keluar)]
+        t['baris'] = sum(len(x) for x in (so, masuk, keluar) if x is not None)
+    job.lapor("Menyiapkan data...", 0.02)
+    ledger, df_sisa = run_fifo_ringkas(
+        so, masuk, keluar, mapping, opt_configs, snapshot=snapshot, log=log,
+        progres=lambda i, n: job.lapor(f"FIFO per produk: {i:,} / {n:,}", 0.05 + 0.75 * i / max(n, 1)))
+    if ledger.empty:
+        return None
+
+    job.lapor("Ringkasan & indeks posisi stok...", 0.82)
+    with ukur(log, 'ringkasan_produk') as t:
+        ringkasan = ringkasan_produk(ledger.df)
+        t['baris'] = len(ringkasan)
+    with ukur(log, 'indeks_posisi') as t:
+        indeks = IndeksStok.dari_ledger(ledger.df)
+        buf = io.BytesIO()
+        indeks.simpan(buf)
+        t['baris'] = len(ledger)
+
+    # Download FIFO result; kolom tambahan baru diisi di sini
+    job.lapor(f"Menulis file {jenis_download}...", 0.88)
+    with ukur(log, f'export_{jenis_download.lower()}') as t:
+        df_final = ledger.lengkap()
+        data_fifo, nama_fifo, mime_fifo = siapkan_download(
+            df_final, jenis_download, format_fifo(df_final.columns), SHEET_FIFO, "fifo_result")
+        t['baris'] = len(df_final)
+        del df_final
+    job.lapor("Menyimpan snapshot lot...", 0.97)
+
+    # Disimpan di job supaya paging/filter (rerun) tidak menghitung ulang FIFO maupun file download
+    return {
+        'id': job.id,
+        'ledger': ledger,
+        'ringkasan': ringkasan,
+        'indeks': indeks,
+        'indeks_parquet': buf.getvalue(),
+        'rentang': (ledger.df['Tanggal'].min().date(), ledger.df['Tanggal'].max().date()),
+        'opsi_produk': ringkasan['Produk'].tolist(),
+        'opsi_keterangan': ledger.df['Keterangan'].unique().dropna().tolist(),
+        'download': (data_fifo, nama_fifo, mime_fifo, jenis_download),
+        'snapshot': (tulis_parquet(df_sisa), len(df_sisa)),
+    }
+
+@st.fragment(run_every=1)
+def pantau_job(job):
+    # Hanya bagian ini yang di-rerun tiap detik selama job berjalan
+    if job.aktif:
+        st.progress(job.progres, text=f"⏳ Job {job.id}: {job.pesan} ({job.durasi():.0f} detik)")
+        if st.button("⛔ Batalkan", key=f"batal_{job.id}"):
+            job.batalkan()
+    else:
+        st.rerun()
+
+def label_job(job):
+    return f"{job.id} — {job.mulai:%d/%m %H:%M:%S} ({job.durasi():.1f} detik)"
+
 st.title("📦 Streamline FIFO by Nadd")
 st.markdown("Aplikasi Cleaning Data & Integrasi FIFO - By Nadiyatul Jenni")
 
 # Sidebar Upload
 st.sidebar.header("📁 Upload Data Sumber")
-file_so = st.sidebar.file_uploader("SO / Stok Awal", type=['xlsx'])
-file_masuk = st.sidebar.file_uploader("Barang Masuk", type=['xlsx'])
-file_keluar = st.sidebar.file_uploader("Barang Keluar", type=['xlsx'])
+file_so = st.sidebar.file_uploader("SO / Stok Awal", type=FORMAT_DIDUKUNG)
+file_masuk = st.sidebar.file_uploader("Barang Masuk", type=FORMAT_DIDUKUNG)
+file_keluar = st.sidebar.file_uploader("Barang Keluar", type=FORMAT_DIDUKUNG)
+file_snapshot = st.sidebar.file_uploader("Snapshot Lot Periode Sebelumnya (Optional)", type=['parquet', 'csv'],
+                                         help="Sisa lot dari run FIFO sebelumnya. Cukup upload transaksi periode baru.")
+ukur_memori = st.sidebar.checkbox("Ukur memori per tahap (diagnostik)", value=False,
+                                  help="Puncak memori dicatat dengan tracemalloc; loop FIFO bisa jauh lebih lambat.")
 
 if 'cleaned_data' not in st.session_state:
     st.session_state['cleaned_data'] = {}
@@ -47,152 +242,179 @@ with tab_cleaning:
     active_files = {k: v for k, v in files.items() if v is not None}
     
     if not active_files:
-        st.info("Silakan upload file Excel di sidebar untuk memulai.")
+        st.info("Silakan upload file Excel / CSV / Parquet di sidebar untuk memulai.")
     else:
         pilihan = st.selectbox("Pilih file yang akan dikelola:", list(active_files.keys()))
         curr_file = active_files[pilihan]
-        
+
+        # Resep cleaning (JSON) mengisi ulang semua pengaturan di bawah; cukup diterapkan sekali per file resep
+        file_resep = st.file_uploader("📂 Muat resep cleaning (opsional)", type=['json'], key=f"upload_resep_{pilihan}")
+        resep_aktif = st.session_state.setdefault('resep_aktif', {})
+        if file_resep is not None and st.session_state.get(f"resep_dipakai_{pilihan}") != file_resep.file_id:
+            try:
+                resep_aktif[pilihan] = baca_resep(file_resep)
+                st.session_state[f"resep_dipakai_{pilihan}"] = file_resep.file_id
+                st.rerun()
+            except ValueError as e:
+                st.error(f"Resep tidak valid: {e}")
+        resep = resep_aktif.get(pilihan, {})
+
         col_c1, col_c2, col_c3 = st.columns(3)
         with col_c1:
-            h_row = st.number_input(f"Baris Header {pilihan}:", min_value=1, value=1)
+            h_row = st.number_input(f"Baris Header {pilihan}:", min_value=1, value=resep.get('h_row', 1))
         with col_c2:
-            d_start = st.number_input(f"Data Mulai Baris:", min_value=1, value=h_row+1)
+            d_start = st.number_input(f"Data Mulai Baris:", min_value=1, value=resep.get('d_start') or h_row+1)
         with col_c3:
-            f_word = st.text_input("Hapus baris mengandung kata (Contoh: TOTAL):")
+            f_word = st.text_input("Hapus baris mengandung kata (Contoh: TOTAL):", value=resep.get('f_word', ""))
 
-        do_trim = st.checkbox("Gunakan Fungsi TRIM", value=True)
+        do_trim = st.checkbox("Gunakan Fungsi TRIM", value=resep.get('do_trim', True))
 
-        df_raw = pd.read_excel(curr_file, header=h_row-1)
-        skip_n = d_start - (h_row + 1)
-        if skip_n > 0: df_raw = df_raw.iloc[skip_n:].reset_index(drop=True)
-        
-        if f_word:
-            mask = df_raw.apply(lambda r: r.astype(str).str.contains(f_word, case=False).any(), axis=1)
-            df_raw = df_raw[~mask].reset_index(drop=True)
+        # Hanya header + 10 baris awal yang dibaca; seluruh file diproses saat Simpan Cleaning.
+        # Hasil di-cache per isi file + pengaturan baris, jadi rerun karena widget lain tidak membaca ulang.
+        cache = cache_global()
+        file_hash = hash_konten(curr_file)
+        kunci_baca = (file_hash, h_row, d_start, f_word)
+        df_raw = cache.ambil_atau_hitung(('preview',) + kunci_baca,
+                                         lambda: baca_preview(curr_file, h_row, d_start, f_word))
 
         st.subheader("Preview Data Asli")
-        st.dataframe(df_raw.head(10))
+        st.dataframe(df_raw)
 
         st.divider()
         st.subheader("⚙️ Pengaturan Kolom & Format")
         
-        selected_info = []
-        for col in df_raw.columns:
-            if "Unnamed" in str(col): continue
-            c1, c2, c3 = st.columns([1, 2, 2])
-            with c1:
-                is_keep = st.checkbox("Keep", value=True, key=f"c_{pilihan}_{col}")
-            with c2:
-                new_n = st.text_input("Rename", value=str(col), key=f"r_{pilihan}_{col}")
-            with c3:
-                f_type = st.selectbox("Format", 
-                    ["Text", "Date", "Date Time", "Currency (Rp)", "integers", "decimal number", "Percent (%)"], 
-                    key=f"f_{pilihan}_{col}")
-            if is_keep:
-                selected_info.append({"old": col, "new": new_n, "type": f_type})
+        # Satu tabel pengaturan (Keep / Rename / Format) per kolom, bukan 3 widget per kolom.
+        # Tabel dasar dibuat ulang hanya jika file / kolom berubah atau resep baru dimuat; selain itu
+        # hanya baris yang diedit sejak rerun terakhir yang dihitung ulang.
+        semua_pengaturan = st.session_state.setdefault('pengaturan_kolom', {})
+        tanda = (file_hash, tuple(map(str, df_raw.columns)), st.session_state.get(f"resep_dipakai_{pilihan}"))
+        pengaturan = semua_pengaturan.get(pilihan)
+        if pengaturan is None or pengaturan[0] != tanda:
+            versi_editor = pengaturan[1] + 1 if pengaturan is not None else 0
+            pengaturan = semua_pengaturan[pilihan] = (tanda, versi_editor, PengaturanKolom(df_raw.columns, resep or None))
+        _, versi_editor, kolom_setting = pengaturan
+        if kolom_setting.hilang:
+            st.warning(f"Kolom resep tidak ada di file ini: {', '.join(kolom_setting.hilang)}")
+
+        # Key editor ikut versi tabel dasar supaya editan lama tidak terbawa ke tabel baru
+        kunci_editor = f"editor_kolom_{pilihan}_{versi_editor}"
+        st.data_editor(
+            kolom_setting.dasar,
+            key=kunci_editor,
+            hide_index=True,
+            num_rows="fixed",
+            disabled=['Kolom'],
+            column_config={
+                'Kolom': st.column_config.TextColumn("Kolom Asli"),
+                'Keep': st.column_config.CheckboxColumn("Keep"),
+                'Nama Baru': st.column_config.TextColumn("Rename"),
+                'Format': st.column_config.SelectboxColumn("Format", options=FORMAT_KOLOM, required=True),
+            },
+        )
+        kolom_setting.terapkan(st.session_state[kunci_editor]['edited_rows'])
+        selected_info = kolom_setting.selected_info()
+
+        st.download_button(
+            label="💾 Download Resep Cleaning",
+            data=resep_ke_json(buat_resep(h_row, d_start, f_word, do_trim, selected_info)),
+            file_name=f"resep_{pilihan.lower()}.json",
+            mime="application/json",
+            help="Pakai lagi di sini atau untuk banyak file sekaligus dengan cleaning_cli.py",
+        )
+
+        jenis_download = st.radio("Format file hasil:", FORMAT_DOWNLOAD, horizontal=True, key=f"dl_{pilihan}")
 
         if st.button(f"🔥 Simpan Cleaning {pilihan}"):
             with st.spinner("Memproses seluruh data..."):
-                cols = [i['old'] for i in selected_info]
-                names = {i['old']: i['new'] for i in selected_info}
-                df_clean = df_raw[cols].rename(columns=names).copy()
-
-                if do_trim:
-                    df_clean = df_clean.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-                for i in selected_info:
-                    target = i['new']
-                    ft = i['type']
-                    
-                    if ft == "Date":
-                        df_clean[target] = pd.to_datetime(df_clean[target], errors='coerce').dt.date
-                    elif ft == "Date Time":
-                        df_clean[target] = pd.to_datetime(df_clean[target], errors='coerce')
-                    elif ft in ["integers", "decimal number", "Currency (Rp)"]:
-                        # Deep Clean: Menghapus titik ribuan dan Rp sebelum konversi agar tidak jadi 0
-                        def clean_numeric_strict(val):
-                            if pd.isna(val) or val == "": return 0.0
-                            s = str(val).replace('Rp', '').replace(' ', '')
-                            if ',' in s and '.' in s: s = s.replace('.', '').replace(',', '.')
-                            elif ',' in s: s = s.replace(',', '.')
-                            s = re.sub(r'[^\d.]', '', s)
-                            return pd.to_numeric(s, errors='coerce') if s != "" else 0.0
-                        
-                        df_clean[target] = df_clean[target].apply(clean_numeric_strict).astype(float)
+                log = LogTahap("Cleaning", ukur_memori, file=pilihan)
+                kunci_clean = ('clean',) + kunci_baca + (do_trim, tuple((i['old'], i['new'], i['type']) for i in selected_info))
+                df_clean = cache.get(kunci_clean)
+                if df_clean is None:
+                    df_clean = bersihkan_file(curr_file, h_row, d_start, f_word, selected_info, do_trim, log=log)
+                    cache.put(kunci_clean, df_clean)
+                else:
+                    log.catat('ambil_cache', baris=len(df_clean))
 
                 st.session_state['cleaned_data'][pilihan] = df_clean
                 st.success(f"Berhasil! {len(df_clean)} baris data {pilihan} disimpan.")
 
                 # Format for display
-                df_display_clean = df_clean.copy()
-                # Format currency
-                currency_cols_clean = [col for col in df_display_clean.columns if any(x in col for x in ['Harga', 'Total', 'Nilai'])]
-                for col in currency_cols_clean:
-                    df_display_clean[col] = pd.to_numeric(df_display_clean[col], errors='coerce').apply(lambda x: f"Rp {x:,.2f}" if pd.notna(x) and x != 0 else ("Rp 0.00" if x == 0 else ""))
-                # Format date
-                date_cols_clean = [col for col in df_display_clean.columns if 'Tanggal' in col or 'Date' in col]
-                for col in date_cols_clean:
-                    if pd.api.types.is_datetime64_any_dtype(df_display_clean[col]):
-                        df_display_clean[col] = df_display_clean[col].dt.strftime('%d/%m/%Y')
-                    elif pd.api.types.is_datetime64_any_dtype(df_display_clean[col].dt):
-                        df_display_clean[col] = df_display_clean[col].dt.strftime('%d/%m/%Y %H:%M:%S')
-                # Format integers
-                int_cols_clean = [col for col in df_display_clean.columns if any(x in col for x in ['Qty', 'Stok'])]
-                for col in int_cols_clean:
-                    df_display_clean[col] = pd.to_numeric(df_display_clean[col], errors='coerce').apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
-
-                st.dataframe(df_display_clean.head(10))
-
-                # Download cleaned data as Excel
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df_clean.to_excel(writer, index=False, sheet_name='Cleaned_Data')
-                    ws = writer.sheets['Cleaned_Data']
-                    for col_idx, col_name in enumerate(df_clean.columns, 1):
-                        let = get_column_letter(col_idx)
-                        ws[f'{let}1'].font = Font(bold=True)
-                        ws.column_dimensions[let].width = 20
-                        for row in range(2, len(df_clean) + 2):
-                            cell = ws[f'{let}{row}']
-                            if pd.isna(cell.value): continue
-                            # Apply formats based on type
-                            for i in selected_info:
-                                if i['new'] == col_name:
-                                    ft = i['type']
-                                    if ft == "Date":
-                                        cell.number_format = 'dd/mm/yyyy'
-                                    elif ft == "Date Time":
-                                        cell.number_format = 'dd/mm/yyyy hh:mm:ss'
-                                    elif ft == "Currency (Rp)":
-                                        cell.number_format = '"Rp" #,##0.00'
-                                    elif ft == "integers":
-                                        cell.number_format = '#,##0'
-                                    elif ft == "decimal number":
-                                        cell.number_format = '#,##0.00'
-                                    break
-
-                buffer.seek(0)
+                with ukur(log, 'format_tampilan') as t:
+                    df_tampil = format_tampilan_cleaning(df_clean.head(10))
+                    t['baris'] = len(df_tampil)
+                st.dataframe(df_tampil)
+
+                # Download cleaned data
+                with ukur(log, f'export_{jenis_download.lower()}') as t:
+                    data_dl, nama_dl, mime_dl = siapkan_download(
+                        df_clean, jenis_download, format_cleaning(df_clean.columns, selected_info),
+                        SHEET_CLEANING, f"cleaned_{pilihan.lower()}")
+                    t['baris'] = len(df_clean)
+                simpan_log(log)
                 st.download_button(
-                    label="📥 Download Cleaned Data (Excel)",
-                    data=buffer,
-                    file_name=f"cleaned_{pilihan.lower()}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    label=f"📥 Download Cleaned Data ({jenis_download})",
+                    data=data_dl,
+                    file_name=nama_dl,
+                    mime=mime_dl
                 )
 
+        # Simpan hasil cleaning ke Penyimpanan Data supaya sesi lain tidak perlu upload & cleaning ulang
+        if pilihan in st.session_state['cleaned_data']:
+            s1, s2 = st.columns([2, 1])
+            with s1:
+                periode_simpan = st.text_input(f"Periode data {pilihan} (contoh: 2024-01)", value=periode_default(),
+                                               key=f"periode_simpan_{pilihan}")
+            with s2:
+                if st.button("💾 Simpan ke Penyimpanan Data", key=f"simpan_data_{pilihan}"):
+                    try:
+                        versi = penyimpanan_global().simpan(pilihan, periode_simpan.strip(),
+                                                            st.session_state['cleaned_data'][pilihan])
+                        st.success(f"Data {pilihan} periode {periode_simpan} disimpan (versi {versi}).")
+                    except ValueError as e:
+                        st.error(str(e))
+
+        tampilkan_diagnostik("Cleaning")
+
 # ==========================================
 # TAB 2: INTEGRASI FIFO (REVISI FIX)
 # ==========================================
 with tab_fifo:
     st.header("🔄 Proses Logika FIFO Terintegrasi")
     
-    df_so_raw = st.session_state['cleaned_data'].get("SO")
-    df_in_raw = st.session_state['cleaned_data'].get("Masuk")
-    df_out_raw = st.session_state['cleaned_data'].get("Keluar")
+    penyimpanan = penyimpanan_global()
+    sumber_data = st.radio("Sumber data:", ["Hasil Cleaning (sesi ini)", "Penyimpanan Data"], horizontal=True,
+                           key="sumber_fifo")
+    dari_penyimpanan = sumber_data == "Penyimpanan Data"
+    if dari_penyimpanan:
+        periode_dipilih = {}
+        k1, k2, k3 = st.columns(3)
+        for kolom_ui, jenis in zip((k1, k2, k3), JENIS_DATA):
+            with kolom_ui:
+                periode_dipilih[jenis] = st.multiselect(f"Periode {jenis}", penyimpanan.periode(jenis), key=f"periode_{jenis}")
+        f1, f2 = st.columns(2)
+        with f1:
+            filter_produk = st.text_input("Hanya produk (pisahkan dengan koma, kosong = semua)", key="filter_produk_fifo")
+        with f2:
+            batas_tanggal = st.date_input("Transaksi sampai tanggal (kosong = semua)", value=None, key="filter_tanggal_fifo")
+        with st.expander("📚 Katalog Penyimpanan Data"):
+            st.dataframe(penyimpanan.daftar(), hide_index=True)
+        # Di sini hanya nama kolom (skema Parquet) yang dibaca; isi data dibaca saat FIFO dijalankan
+        skema = {jenis: pd.DataFrame(columns=penyimpanan.kolom(jenis, periode_dipilih[jenis]))
+                 for jenis in JENIS_DATA if periode_dipilih[jenis]}
+        df_so_raw, df_in_raw, df_out_raw = (skema.get(jenis) for jenis in JENIS_DATA)
+    else:
+        df_so_raw = st.session_state['cleaned_data'].get("SO")
+        df_in_raw = st.session_state['cleaned_data'].get("Masuk")
+        df_out_raw = st.session_state['cleaned_data'].get("Keluar")
+    df_snapshot = None
+    if file_snapshot is not None:
+        df_snapshot = cache_global().ambil_atau_hitung(('snapshot', hash_konten(file_snapshot)),
+                                                       lambda: baca_tabel(file_snapshot))
 
-    siap_proses = (df_in_raw is not None or df_so_raw is not None) and df_out_raw is not None
+    siap_proses = (df_in_raw is not None or df_so_raw is not None or df_snapshot is not None) and df_out_raw is not None
 
     if not siap_proses:
-        st.warning("⚠️ Minimal harus ada (SO + Keluar) atau (Masuk + Keluar) untuk memulai.")
+        st.warning("⚠️ Minimal harus ada (SO + Keluar), (Masuk + Keluar) atau (Snapshot + Keluar) untuk memulai.")
     else:
         d_so_ui = df_so_raw if df_so_raw is not None else pd.DataFrame(columns=['-'])
         d_in_ui = df_in_raw if df_in_raw is not None else pd.DataFrame(columns=['-'])
@@ -238,204 +460,100 @@ with tab_fifo:
 
         opt_configs = st.session_state.opt_configs
 
-        if st.button("🚀 JALANKAN CORE FIFO"):
+        jenis_download_fifo = st.radio("Format file hasil:", FORMAT_DOWNLOAD, horizontal=True, key="dl_fifo")
+
+        jobs = st.session_state.setdefault('jobs_fifo', {})
+        ada_job_aktif = any(j.aktif for j in jobs.values())
+
+        if st.button("🚀 JALANKAN CORE FIFO", disabled=ada_job_aktif):
+            mapping = {
+                'p_so': map_p_so, 'q_so': map_q_so, 'h_so': map_h_so,
+                't_in': map_t_in, 'p_in': map_p_in, 'q_in': map_q_in, 'h_in': map_h_in,
+                't_out': map_t_out, 'p_out': map_p_out, 'q_out': map_q_out,
+            }
             # Validation: Ensure mandatory mappings are not '-'
-            errors = []
-            if df_so_raw is not None:
-                if map_p_so == '-': errors.append("Produk (SO) tidak boleh '-'")
-                if map_q_so == '-': errors.append("Qty (SO) tidak boleh '-'")
-                if map_h_so == '-': errors.append("Harga Satuan (SO) tidak boleh '-'")
-            if df_in_raw is not None:
-                if map_t_in == '-': errors.append("Tanggal (Masuk) tidak boleh '-'")
-                if map_p_in == '-': errors.append("Produk (Masuk) tidak boleh '-'")
-                if map_q_in == '-': errors.append("Qty (Masuk) tidak boleh '-'")
-                if map_h_in == '-': errors.append("Harga Satuan (Masuk) tidak boleh '-'")
-            if map_t_out == '-': errors.append("Tanggal (Keluar) tidak boleh '-'")
-            if map_p_out == '-': errors.append("Produk (Keluar) tidak boleh '-'")
-            if map_q_out == '-': errors.append("Qty (Keluar) tidak boleh '-'")
+            errors = validasi_mapping(mapping, df_so_raw is not None, df_in_raw is not None)
 
             if errors:
                 st.error("Mapping kolom wajib tidak boleh '-'. Silakan pilih kolom yang valid.")
                 for err in errors:
                     st.error(f"- {err}")
             else:
-                try:
-                    # Proses Data Masuk & SO
-                    if df_in_raw is not None:
-                        d_in = df_in_raw.copy()
-                        d_in['TGL_FIFO'] = pd.to_datetime(d_in[map_t_in])
-                        d_in['QTY_FIFO'] = pd.to_numeric(d_in[map_q_in]).fillna(0)
-                        d_in['PRC_FIFO'] = pd.to_numeric(d_in[map_h_in]).fillna(0)
-                        d_in['SOURCE'] = 1
-                    else: d_in = pd.DataFrame()
-
-                    if df_so_raw is not None:
-                        d_so = df_so_raw.copy()
-                        ref_y = d_in['TGL_FIFO'].dt.year.min() if not d_in.empty else pd.Timestamp.now().year
-                        d_so['TGL_FIFO'] = pd.Timestamp(year=int(ref_y)-1, month=12, day=31)
-                        d_so['QTY_FIFO'] = pd.to_numeric(d_so[map_q_so]).fillna(0)
-                        d_so['PRC_FIFO'] = pd.to_numeric(d_so[map_h_so]).fillna(0)
-                        d_so['SOURCE'] = 0
-                    else: d_so = pd.DataFrame()
-
-                    # Merge Inventory
-                    inv_merged = pd.concat([d_so, d_in], ignore_index=True).sort_values(['TGL_FIFO', 'SOURCE'])
-
-                    # Proses Data Keluar
-                    d_out = df_out_raw.copy()
-                    d_out['TGL_FIFO'] = pd.to_datetime(d_out[map_t_out])
-                    d_out['QTY_FIFO'] = pd.to_numeric(d_out[map_q_out]).fillna(0)
-                    d_out = d_out.sort_values(by=['TGL_FIFO']).reset_index(drop=True)
-
-                    hasil = []
-                    prod_keys = set(inv_merged[map_p_in if not d_in.empty else map_p_so].unique()).union(set(d_out[map_p_out].unique()))
-
-                    for kode in prod_keys:
-                        if pd.isna(kode) or kode == "-": continue
-
-                        stok_antrean = []
-                        masuk_produk = inv_merged[inv_merged[map_p_in if not d_in.empty else map_p_so] == kode].to_dict('records')
-                        keluar_produk = d_out[d_out[map_p_out] == kode].to_dict('records')
-
-                        # Proses Barang Masuk (SO + Masuk)
-                        for m in masuk_produk:
-                            opt = {}
-                            for oc in opt_configs:
-                                col = oc['so'] if m['SOURCE'] == 0 else oc['in']
-                                if col == "-":
-                                    opt[oc['label']] = pd.NA
-                                else:
-                                    opt[oc['label']] = m.get(col, pd.NA)
-                            stok_antrean.append({
-                                'qty': m['QTY_FIFO'],
-                                'prc': m['PRC_FIFO'],
-                                'opt': opt
-                            })
-
-                            hasil.append({
-                                'Tanggal': m['TGL_FIFO'],
-                                'Produk': kode,
-                                **opt,
-                                'Qty Masuk': m['QTY_FIFO'],
-                                'Harga Satuan Masuk': m['PRC_FIFO'],
-                                'Total Masuk': m['QTY_FIFO'] * m['PRC_FIFO'],
-                                'Qty Keluar': 0,
-                                'Harga Satuan Keluar': 0,
-                                'Total Keluar': 0,
-                                'Keterangan': 'BARANG MASUK'
-                            })
-
-                        # Proses Barang Keluar
-                        for k in keluar_produk:
-                            qty_perlu = k['QTY_FIFO']
-                            while qty_perlu > 0:
-                                if not stok_antrean:
-                                    opt_empty = {}
-                                    for oc in opt_configs:
-                                        col = oc['out']
-                                        if col == "-":
-                                            opt_empty[oc['label']] = pd.NA
-                                        else:
-                                            opt_empty[oc['label']] = k.get(col, pd.NA)
-                                    hasil.append({
-                                        'Tanggal': k['TGL_FIFO'], 'Produk': kode, **opt_empty,
-                                        'Qty Masuk': 0, 'Harga Satuan Masuk': 0, 'Total Masuk': 0,
-                                        'Qty Keluar': qty_perlu, 'Harga Satuan Keluar': 0, 'Total Keluar': 0,
-                                        'Keterangan': 'OUT OF STOCK'
-                                    })
-                                    qty_perlu = 0
-                                else:
-                                    stok_skrg = stok_antrean[0]
-                                    if stok_skrg['qty'] <= qty_perlu:
-                                        ambil = stok_skrg['qty']; qty_perlu -= ambil; hna = stok_skrg['prc']
-                                        opt_ambil = stok_skrg['opt']
-                                        stok_antrean.pop(0)
-                                    else:
-                                        ambil = qty_perlu; qty_perlu = 0; hna = stok_skrg['prc']
-                                        opt_ambil = stok_skrg['opt']
-                                        stok_skrg['qty'] -= ambil
-
-                                    # For BARANG KELUAR, use opt from keluar table
-                                    opt_keluar = {}
-                                    for oc in opt_configs:
-                                        col = oc['out']
-                                        if col == "-":
-                                            opt_keluar[oc['label']] = pd.NA
-                                        else:
-                                            opt_keluar[oc['label']] = k.get(col, pd.NA)
-
-                                    hasil.append({
-                                        'Tanggal': k['TGL_FIFO'], 'Produk': kode, **opt_keluar,
-                                        'Qty Masuk': 0, 'Harga Satuan Masuk': 0, 'Total Masuk': 0,
-                                        'Qty Keluar': ambil, 'Harga Satuan Keluar': hna, 'Total Keluar': ambil * hna,
-                                        'Keterangan': 'BARANG KELUAR'
-                                    })
-
-                    df_final = pd.DataFrame(hasil)
-                    if not df_final.empty:
-                        df_final = df_final.sort_values(by=['Produk', 'Tanggal']).reset_index(drop=True)
-                        df_final['Stok'] = df_final.groupby('Produk')['Qty Masuk'].cumsum() - df_final.groupby('Produk')['Qty Keluar'].cumsum()
-                        df_final['Nilai Stok'] = df_final.groupby('Produk')['Total Masuk'].cumsum() - df_final.groupby('Produk')['Total Keluar'].cumsum()
-
-                        # Update Keterangan for last row per product
-                        df_final['is_last'] = df_final.groupby('Produk').cumcount(ascending=False) == 0
-                        def assign_final_keterangan(row):
-                            if row['is_last']:
-                                if row['Keterangan'] == 'OUT OF STOCK':
-                                    return 'STOK SEKARANG (OUT OF STOCK)'
-                                else:
-                                    return 'STOK SEKARANG'
-                            return row['Keterangan']
-                        df_final['Keterangan'] = df_final.apply(assign_final_keterangan, axis=1)
-                        df_final = df_final.drop(columns=['is_last'])
-
-                        st.success("✅ BERHASIL")
-
-                        # Format for display
-                        df_display = df_final.copy()
-                        # Format currency
-                        currency_cols = [col for col in df_display.columns if any(x in col for x in ['Harga', 'Total', 'Nilai'])]
-                        for col in currency_cols:
-                            df_display[col] = pd.to_numeric(df_display[col], errors='coerce').apply(lambda x: f"Rp {x:,.2f}" if pd.notna(x) and x != 0 else ("Rp 0.00" if x == 0 else ""))
-                        # Format date
-                        if 'Tanggal' in df_display.columns:
-                            df_display['Tanggal'] = df_display['Tanggal'].dt.strftime('%d/%m/%Y %H:%M:%S')
-                        # Format integers
-                        int_cols = [col for col in df_display.columns if any(x in col for x in ['Qty', 'Stok'])]
-                        for col in int_cols:
-                            df_display[col] = pd.to_numeric(df_display[col], errors='coerce').apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
-
-                        st.dataframe(df_display)
-
-                        # Download FIFO result as Excel
-                        buffer_fifo = io.BytesIO()
-                        with pd.ExcelWriter(buffer_fifo, engine='openpyxl') as writer:
-                            df_final.to_excel(writer, index=False, sheet_name='FIFO_Result')
-                            ws = writer.sheets['FIFO_Result']
-                            for col_idx, col_name in enumerate(df_final.columns, 1):
-                                let = get_column_letter(col_idx)
-                                ws[f'{let}1'].font = Font(bold=True)
-                                ws.column_dimensions[let].width = 20
-                                for row in range(2, len(df_final) + 2):
-                                    cell = ws[f'{let}{row}']
-                                    if pd.isna(cell.value): continue
-                                    # Apply formats
-                                    if col_name == 'Tanggal':
-                                        cell.number_format = 'dd/mm/yyyy hh:mm:ss'
-                                    elif any(x in col_name for x in ['Harga', 'Total', 'Nilai']):
-                                        cell.number_format = '"Rp" #,##0.00'
-                                    elif any(x in col_name for x in ['Qty', 'Stok']):
-                                        cell.number_format = '#,##0'
-
-                        buffer_fifo.seek(0)
-                        st.download_button(
-                            label="📥 Download FIFO Result (Excel)",
-                            data=buffer_fifo,
-                            file_name="fifo_result.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                except Exception as e:
-                    st.error(f"Error: {e}")
+                sumber = {"SO": df_so_raw, "Masuk": df_in_raw, "Keluar": df_out_raw}
+                if dari_penyimpanan:
+                    # Baca hanya kolom yang di-mapping; filter produk & tanggal dijalankan pembaca Parquet
+                    kolom = kolom_dipakai(mapping, opt_configs)
+                    produk_pilih = [p.strip() for p in filter_produk.split(",") if p.strip()]
+                    kunci_produk = {"SO": mapping['p_so'], "Masuk": mapping['p_in'], "Keluar": mapping['p_out']}
+                    kunci_tanggal = {"SO": None, "Masuk": mapping['t_in'], "Keluar": mapping['t_out']}
+
+                    def pembaca(jenis):
+                        produk = (kunci_produk[jenis], produk_pilih) if produk_pilih else None
+                        rentang = (kunci_tanggal[jenis], None, batas_tanggal) if batas_tanggal and kunci_tanggal[jenis] else None
+                        # Semua argumen diikat sekarang; rerun berikutnya tidak memengaruhi job yang berjalan
+                        args = (jenis, periode_dipilih[jenis], kolom[jenis], produk, rentang)
+                        return lambda: penyimpanan.baca(*args)
+                    sumber = {jenis: pembaca(jenis) if df is not None else None for jenis, df in sumber.items()}
+
+                # FIFO + ekspor berjalan di thread; widget lain tetap bisa dipakai selama job berjalan
+                log = LogTahap("FIFO", ukur_memori)
+                job = jalankan(jobs, "FIFO", job_fifo, sumber["SO"], sumber["Masuk"], sumber["Keluar"], mapping,
+                               [dict(oc) for oc in opt_configs], df_snapshot, jenis_download_fifo, log,
+                               info={'log': log})
+                st.session_state['job_fifo'] = job.id
+
+        job = jobs.get(st.session_state.get('job_fifo'))
+        if job is not None and job.aktif:
+            pantau_job(job)
+        elif job is not None and job.status == GAGAL:
+            st.error(f"Error: {job.error}")
+        elif job is not None and job.status == DIBATALKAN:
+            st.warning(f"Job {job.id} dibatalkan.")
+        elif job is not None and job.status == SELESAI and job.hasil is None:
+            st.warning("Tidak ada transaksi untuk diproses.")
+
+        for j in jobs.values():
+            if not j.aktif and not j.info.get('log_disimpan'):
+                simpan_log(j.info['log'])
+                j.info['log_disimpan'] = True
+
+        # Hasil tiap job yang selesai disimpan per job ID; bisa dibuka lagi tanpa menghitung ulang
+        selesai = [j for j in jobs.values() if j.status == SELESAI and j.hasil is not None][::-1]
+        hasil = None
+        if selesai:
+            if st.session_state.get('job_dipilih') not in [j.id for j in selesai]:
+                st.session_state['job_dipilih'] = selesai[0].id
+            if st.session_state.get('job_terakhir_dilihat') != selesai[0].id:
+                # Job baru selesai: tampilkan hasilnya
+                st.session_state['job_terakhir_dilihat'] = selesai[0].id
+                st.session_state['job_dipilih'] = selesai[0].id
+            per_id = {j.id: j for j in selesai}
+            job_dipilih = st.selectbox("Hasil run", list(per_id), key="job_dipilih",
+                                       format_func=lambda i: label_job(per_id[i]))
+            hasil = per_id[job_dipilih].hasil
+
+        if hasil is not None:
+            st.success("✅ BERHASIL")
+            tampilkan_ledger(hasil)
+            tampilkan_posisi_stok(hasil)
+
+            data_fifo, nama_fifo, mime_fifo, jenis_fifo = hasil['download']
+            st.download_button(
+                label=f"📥 Download FIFO Result ({jenis_fifo})",
+                data=data_fifo,
+                file_name=nama_fifo,
+                mime=mime_fifo
+            )
+            # Snapshot sisa lot untuk run periode berikutnya
+            data_snapshot, n_lot = hasil['snapshot']
+            st.download_button(
+                label=f"📥 Download Snapshot Lot ({n_lot} lot)",
+                data=data_snapshot,
+                file_name="fifo_snapshot.parquet",
+                mime=MIME["Parquet"]
+            )
+
+        tampilkan_diagnostik("FIFO")
 
 # Footer watermark
 st.markdown("---")
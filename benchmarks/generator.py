@@ -0,0 +1,180 @@
+"""Generator data inventory sintetis (SO / Barang Masuk / Barang Keluar).
+
+Bentuk file meniru export ERP mentah sebelum cleaning: harga berupa teks
+"Rp 1.234,56", spasi berlebih di kode barang, dan baris TOTAL di akhir tabel.
+
+    python -m benchmarks.generator --produk 2000 --masuk 50000 --keluar 120000 --folder data_bench
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from export import tulis_csv, tulis_excel, tulis_parquet
+
+# Pengaturan cleaning & mapping FIFO yang cocok dengan kolom hasil generator
+SELECTED_INFO = {
+    "SO": [
+        {'old': 'Kode Barang', 'new': 'Kode', 'type': 'Text'},
+        {'old': 'Qty', 'new': 'Qty', 'type': 'integers'},
+        {'old': 'Harga Satuan', 'new': 'Harga', 'type': 'Currency (Rp)'},
+    ],
+    "Masuk": [
+        {'old': 'Tanggal', 'new': 'Tanggal', 'type': 'Date Time'},
+        {'old': 'Kode Barang', 'new': 'Kode', 'type': 'Text'},
+        {'old': 'Qty', 'new': 'Qty', 'type': 'integers'},
+        {'old': 'Harga Satuan', 'new': 'Harga', 'type': 'Currency (Rp)'},
+    ],
+    "Keluar": [
+        {'old': 'Tanggal', 'new': 'Tanggal', 'type': 'Date Time'},
+        {'old': 'Kode Barang', 'new': 'Kode', 'type': 'Text'},
+        {'old': 'Qty', 'new': 'Qty', 'type': 'integers'},
+    ],
+}
+MAPPING = {
+    'p_so': 'Kode', 'q_so': 'Qty', 'h_so': 'Harga',
+    't_in': 'Tanggal', 'p_in': 'Kode', 'q_in': 'Qty', 'h_in': 'Harga',
+    't_out': 'Tanggal', 'p_out': 'Kode', 'q_out': 'Qty',
+}
+KATA_FILTER = 'TOTAL'
+FORMAT_TANGGAL = 'dd/mm/yyyy hh:mm:ss'
+
+
+def _nama_opsional(i):
+    return f"Info {i + 1}"
+
+
+def selected_info(n_opsional):
+    """`selected_info` per tabel, termasuk kolom opsional Info 1..n."""
+    hasil = {}
+    for nama, info in SELECTED_INFO.items():
+        hasil[nama] = info + [{'old': _nama_opsional(i), 'new': _nama_opsional(i), 'type': 'Text'}
+                              for i in range(n_opsional)]
+    return hasil
+
+
+def opt_configs(n_opsional):
+    return [{'label': _nama_opsional(i), 'so': _nama_opsional(i), 'in': _nama_opsional(i), 'out': _nama_opsional(i)}
+            for i in range(n_opsional)]
+
+
+def _rupiah(nilai):
+    # 1234.5 -> "Rp 1.234,50"
+    return ["Rp " + f"{x:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") for x in nilai]
+
+
+def _kolom_opsional(rng, n, n_opsional):
+    return {_nama_opsional(i): rng.choice([f"OPT{i + 1}-{k}" for k in range(20)], size=n) for i in range(n_opsional)}
+
+
+def _baris_total(df, kolom_qty='Qty'):
+    total = {col: None for col in df.columns}
+    total[df.columns[0]] = 'TOTAL'
+    total[kolom_qty] = df[kolom_qty].sum()
+    return pd.concat([df, pd.DataFrame([total])], ignore_index=True)
+
+
+def buat_data(n_produk=500, n_masuk=10_000, n_keluar=25_000, variasi_harga=0.1, rasio_oos=0.05,
+              n_opsional=1, tanggal_awal='2024-01-01', n_hari=365, seed=42):
+    """Buat dict {'SO', 'Masuk', 'Keluar'} berisi DataFrame mentah (belum di-cleaning).
+
+    `variasi_harga` = simpangan relatif harga tiap transaksi terhadap harga dasar produk.
+    `rasio_oos` = porsi produk yang total keluarnya melebihi stok (memicu OUT OF STOCK).
+    """
+    rng = np.random.default_rng(seed)
+    kode = np.array([f"BRG-{i:06d}" for i in range(n_produk)])
+    harga_dasar = rng.uniform(1_000, 250_000, size=n_produk).round(-2)
+    awal = pd.Timestamp(tanggal_awal)
+
+    def harga(prod_idx):
+        h = harga_dasar[prod_idx] * (1 + variasi_harga * rng.standard_normal(len(prod_idx)))
+        return np.maximum(h, 100).round(2)
+
+    def tanggal(n):
+        detik = rng.integers(0, n_hari * 86_400, size=n)
+        return np.sort(awal + pd.to_timedelta(detik, unit='s'))
+
+    qty_so = rng.integers(0, 100, size=n_produk)
+    so = pd.DataFrame({
+        'Kode Barang': kode,
+        'Nama Barang': [f"Barang {i}" for i in range(n_produk)],
+        'Qty': qty_so,
+        'Harga Satuan': _rupiah(harga(np.arange(n_produk))),
+        **_kolom_opsional(rng, n_produk, n_opsional),
+    })
+
+    prod_in = rng.integers(0, n_produk, size=n_masuk)
+    qty_in = rng.integers(1, 50, size=n_masuk)
+    masuk = pd.DataFrame({
+        'Tanggal': tanggal(n_masuk),
+        'Kode Barang': np.char.add(kode[prod_in], '  '),
+        'Qty': qty_in,
+        'Harga Satuan': _rupiah(harga(prod_in)),
+        **_kolom_opsional(rng, n_masuk, n_opsional),
+    })
+
+    # Qty keluar diskalakan per produk: ~80% stok, atau ~130% untuk produk yang dibuat out of stock
+    prod_out = rng.integers(0, n_produk, size=n_keluar)
+    mentah = rng.integers(1, 20, size=n_keluar).astype(float)
+    stok = qty_so + np.bincount(prod_in, weights=qty_in, minlength=n_produk)
+    permintaan = np.bincount(prod_out, weights=mentah, minlength=n_produk)
+    target = np.where(rng.random(n_produk) < rasio_oos, 1.3, 0.8) * stok
+    skala = np.divide(target, permintaan, out=np.zeros(n_produk), where=permintaan > 0)
+    qty_out = np.maximum(np.round(mentah * skala[prod_out]), 1).astype(int)
+    keluar = pd.DataFrame({
+        'Tanggal': tanggal(n_keluar),
+        'Kode Barang': kode[prod_out],
+        'Qty': qty_out,
+        **_kolom_opsional(rng, n_keluar, n_opsional),
+    })
+
+    return {"SO": _baris_total(so), "Masuk": _baris_total(masuk), "Keluar": _baris_total(keluar)}
+
+
+def tulis_data(data, folder, fmt='xlsx'):
+    """Tulis tiap tabel ke `folder` sebagai so/masuk/keluar.<fmt>; kembalikan dict path."""
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for nama, df in data.items():
+        path = os.path.join(folder, f"{nama.lower()}.{fmt}")
+        if fmt == 'csv':
+            tulis_csv(df, path)
+        elif fmt == 'parquet':
+            tulis_parquet(df, path)
+        else:
+            # Sel Tanggal ditulis sebagai tanggal Excel sungguhan, seperti export ERP
+            tulis_excel(df, [FORMAT_TANGGAL if col == 'Tanggal' else None for col in df.columns], 'Sheet1', path)
+        paths[nama] = path
+    return paths
+
+
+def tambah_argumen(parser):
+    parser.add_argument('--produk', type=int, default=500, help="Jumlah produk")
+    parser.add_argument('--masuk', type=int, default=10_000, help="Jumlah baris Barang Masuk")
+    parser.add_argument('--keluar', type=int, default=25_000, help="Jumlah baris Barang Keluar")
+    parser.add_argument('--variasi-harga', type=float, default=0.1, help="Simpangan relatif harga (0.1 = 10%%)")
+    parser.add_argument('--rasio-oos', type=float, default=0.05, help="Porsi produk yang dibuat out of stock")
+    parser.add_argument('--opsional', type=int, default=1, help="Jumlah kolom tambahan (Info 1..n)")
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def parameter_dari(args):
+    return dict(n_produk=args.produk, n_masuk=args.masuk, n_keluar=args.keluar, variasi_harga=args.variasi_harga,
+                rasio_oos=args.rasio_oos, n_opsional=args.opsional, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat workbook SO/Masuk/Keluar sintetis untuk benchmark.")
+    tambah_argumen(parser)
+    parser.add_argument('--folder', default='data_bench', help="Folder output")
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'parquet'], default='xlsx')
+    args = parser.parse_args(argv)
+
+    paths = tulis_data(buat_data(**parameter_dari(args)), args.folder, args.format)
+    for nama, path in paths.items():
+        print(f"{nama}: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark per tahap: baca Excel, cleaning, loop FIFO, Stok/Nilai Stok, format tampilan, ekspor Excel.
+
+Tahap baca & cleaning memakai jalur yang sama dengan tombol "Simpan Cleaning":
+`baca_filter` = ingest.baca_chunk + lewati baris + filter kata (iter_data), dan
+`cleaning` = bersihkan_file dari file xlsx sampai DataFrame hasil (termasuk baca).
+
+Data dibuat oleh benchmarks.generator (tanpa file contoh asli). Tiap tahap diukur
+dua kali terpisah: waktu (minimum dari --ulang percobaan) dan puncak memori lewat
+tracemalloc, karena tracemalloc sendiri memperlambat eksekusi.
+
+    python -m benchmarks.run_bench --ukuran sedang
+    python -m benchmarks.run_bench --ukuran sedang --simpan-baseline
+    python -m benchmarks.run_bench --ukuran sedang --toleransi 0.3
+
+Hasil dibandingkan dengan baseline JSON (default benchmarks/baseline.json).
+Exit code 1 jika ada tahap yang lebih lambat dari baseline * (1 + toleransi)
+atau hasil FIFO (jumlah baris, total Qty/Nilai) berbeda dengan baseline.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import generator
+import pandas as pd
+
+from cleaning import bersihkan_file, iter_data
+from export import tulis_fifo_excel
+from fifo_engine import (LedgerRingkas, bangun_ledger, hitung_stok, proses_fifo, referensi_opsional, siapkan_inventory,
+                         siapkan_keluar)
+from tampilan import ambil_halaman, format_tampilan_fifo, ringkasan_produk
+
+BASELINE_DEFAULT = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+UKURAN = {
+    'kecil': dict(n_produk=200, n_masuk=2_000, n_keluar=5_000),
+    'sedang': dict(n_produk=1_000, n_masuk=20_000, n_keluar=50_000),
+    'besar': dict(n_produk=5_000, n_masuk=100_000, n_keluar=250_000),
+}
+
+TAHAP = ['baca_filter', 'cleaning', 'fifo', 'stok', 'tampilan', 'export']
+
+
+def _ukur_waktu(fungsi, ulang):
+    terbaik = None
+    for _ in range(ulang):
+        gc.collect()
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return hasil, terbaik
+
+
+def _ukur_memori(fungsi):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fungsi()
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return puncak
+
+
+def _jalankan_tahap(folder, params, ulang, profil_memori):
+    """Jalankan seluruh tahap berurutan; kembalikan (hasil per tahap, df_final)."""
+    n_opsional = params['n_opsional']
+    info = generator.selected_info(n_opsional)
+    opt = generator.opt_configs(n_opsional)
+    mapping = generator.MAPPING
+    paths = {nama: os.path.join(folder, f"{nama.lower()}.xlsx") for nama in info}
+    hasil = {}
+
+    def ukur(nama, fungsi, n_baris):
+        out, detik = _ukur_waktu(fungsi, ulang)
+        hasil[nama] = {'detik': round(detik, 4), 'baris': n_baris(out)}
+        if profil_memori:
+            hasil[nama]['puncak_mb'] = round(_ukur_memori(fungsi) / 2**20, 2)
+        return out
+
+    # Pengaturan default tab Data Cleaning: header baris 1, data mulai baris 2
+    ukur('baca_filter', lambda: {nama: pd.concat(list(iter_data(p, 1, 2, generator.KATA_FILTER)), ignore_index=True)
+                                 for nama, p in paths.items()},
+         lambda d: sum(len(df) for df in d.values()))
+    clean = ukur('cleaning',
+                 lambda: {nama: bersihkan_file(p, 1, 2, generator.KATA_FILTER, info[nama], True)
+                          for nama, p in paths.items()},
+                 lambda d: sum(len(df) for df in d.values()))
+
+    def fifo():
+        inv, kolom_produk = siapkan_inventory(clean['SO'], clean['Masuk'], mapping)
+        d_out = siapkan_keluar(clean['Keluar'], mapping)
+        return inv, d_out, proses_fifo(inv, kolom_produk, d_out, mapping['p_out'])
+    inv, d_out, raw_fifo = ukur('fifo', fifo, lambda r: len(r[2]['src']))
+
+    df_ledger = bangun_ledger(raw_fifo, inv)
+    # hitung_stok tidak mengubah `df_ledger` (sort_values membuat salinan)
+    ledger = LedgerRingkas(ukur('stok', lambda: hitung_stok(df_ledger), len), referensi_opsional(inv, d_out, opt))
+
+    # Seperti app.py: ringkasan per produk + satu halaman ledger yang diformat
+    ukur('tampilan', lambda: (ringkasan_produk(ledger.df),
+                              format_tampilan_fifo(ledger.lengkap(ambil_halaman(ledger.df, 1, 100)))),
+         lambda r: len(r[1]))
+    # Kolom tambahan diisi saat ekspor, jadi ikut diukur di tahap ini
+    ukur('export', lambda: tulis_fifo_excel(ledger.lengkap(), io.BytesIO()), lambda buf: len(ledger))
+    df_final = ledger.lengkap()
+    hasil['export']['mb'] = round(len(tulis_fifo_excel(df_final).getvalue()) / 2**20, 2)
+    return hasil, df_final
+
+
+def sidik_hasil(df_final):
+    """Ringkasan hasil FIFO untuk memastikan optimasi tidak mengubah angka."""
+    akhir = df_final.groupby('Produk', sort=False).tail(1)
+    return {
+        'baris': int(len(df_final)),
+        'qty_masuk': round(float(df_final['Qty Masuk'].sum()), 2),
+        'qty_keluar': round(float(df_final['Qty Keluar'].sum()), 2),
+        'total_keluar': round(float(df_final['Total Keluar'].sum()), 2),
+        'nilai_stok_akhir': round(float(akhir['Nilai Stok'].sum()), 2),
+        'keterangan': {str(k): int(v) for k, v in df_final['Keterangan'].astype(str).value_counts().sort_index().items()},
+    }
+
+
+def bandingkan(laporan, baseline, toleransi):
+    """Kembalikan daftar pesan regresi terhadap baseline (kosong = lolos)."""
+    masalah = []
+    if baseline.get('parameter') != laporan['parameter']:
+        return ["Parameter data berbeda dengan baseline; simpan baseline baru dengan --simpan-baseline."]
+    if sorted(baseline.get('tahap', {})) != sorted(TAHAP):
+        return ["Tahap benchmark berbeda dengan baseline (baseline lama); simpan baseline baru dengan --simpan-baseline."]
+    if baseline.get('sidik') != laporan['sidik']:
+        masalah.append(f"Hasil FIFO berbeda: baseline {baseline.get('sidik')} vs sekarang {laporan['sidik']}")
+    for nama in TAHAP:
+        lama = baseline.get('tahap', {}).get(nama, {}).get('detik')
+        baru = laporan['tahap'][nama]['detik']
+        if lama and baru > lama * (1 + toleransi):
+            masalah.append(f"{nama}: {baru:.3f}s > baseline {lama:.3f}s (+{(baru / lama - 1) * 100:.0f}%)")
+    return masalah
+
+
+def cetak(laporan, baseline=None):
+    print(f"{'Tahap':<12}{'Detik':>10}{'Baseline':>10}{'Puncak MB':>11}{'Baris':>11}")
+    for nama in TAHAP:
+        h = laporan['tahap'][nama]
+        lama = (baseline or {}).get('tahap', {}).get(nama, {}).get('detik')
+        kolom_lama = f"{lama:>10.3f}" if lama else f"{'-':>10}"
+        puncak = h.get('puncak_mb')
+        kolom_puncak = f"{puncak:>11.1f}" if puncak is not None else f"{'-':>11}"
+        print(f"{nama:<12}{h['detik']:>10.3f}{kolom_lama}{kolom_puncak}{h['baris']:>11,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tahap cleaning & FIFO dengan data sintetis.")
+    generator.tambah_argumen(parser)
+    parser.add_argument('--ukuran', choices=list(UKURAN), help="Preset jumlah produk/transaksi (menimpa --produk/--masuk/--keluar)")
+    parser.add_argument('--ulang', type=int, default=3, help="Jumlah percobaan per tahap (diambil yang tercepat)")
+    parser.add_argument('--tanpa-memori', action='store_true', help="Lewati profil memori tracemalloc")
+    parser.add_argument('--baseline', default=BASELINE_DEFAULT, help="File baseline JSON")
+    parser.add_argument('--simpan-baseline', action='store_true', help="Simpan hasil run ini sebagai baseline")
+    parser.add_argument('--toleransi', type=float, default=0.2, help="Batas perlambatan relatif (0.2 = 20%%)")
+    parser.add_argument('--output', help="Simpan laporan JSON run ini ke file")
+    args = parser.parse_args(argv)
+
+    params = generator.parameter_dari(args)
+    if args.ukuran:
+        params.update(UKURAN[args.ukuran])
+
+    with tempfile.TemporaryDirectory() as folder:
+        generator.tulis_data(generator.buat_data(**params), folder, 'xlsx')
+        tahap, df_final = _jalankan_tahap(folder, params, max(args.ulang, 1), not args.tanpa_memori)
+
+    laporan = {'parameter': params, 'tahap': tahap, 'sidik': sidik_hasil(df_final)}
+    baseline = None
+    if os.path.exists(args.baseline) and not args.simpan_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    cetak(laporan, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(laporan, f, indent=2)
+    if args.simpan_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(laporan, f, indent=2)
+        print(f"Baseline disimpan ke {args.baseline}")
+        return 0
+    if baseline is None:
+        print("Belum ada baseline; jalankan dengan --simpan-baseline untuk membuatnya.")
+        return 0
+
+    masalah = bandingkan(laporan, baseline, args.toleransi)
+    for pesan in masalah:
+        print("REGRESI:", pesan)
+    if not masalah:
+        print("Tidak ada regresi terhadap baseline.")
+    return 1 if masalah else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Cache DataFrame hasil parsing/cleaning antar rerun Streamlit.
+
+Kunci cache dibentuk dari hash isi file upload + pengaturan yang memengaruhi hasil
+(h_row, d_start, f_word, dst), sehingga mengganti Rename/Format tidak memicu
+pembacaan ulang workbook. Data disimpan di memori dengan eviksi LRU; jika
+`FIFO_CACHE_DIR` diset, entri yang tergeser ditulis ke Parquet di folder tsb
+dan dibaca kembali saat dibutuhkan.
+
+Cache dipakai bersama oleh semua sesi Streamlit (masing-masing di thread
+script sendiri), jadi setiap akses ke struktur data internal dijaga lock.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_ITEMS = 16
+MAX_HASH_UPLOAD = 256
+
+# Hash per file_id upload Streamlit (LRU), supaya isi file tidak di-hash ulang tiap rerun
+_hash_upload = OrderedDict()
+_kunci_hash = threading.Lock()
+
+
+def hash_konten(src):
+    """SHA-1 dari isi file (UploadedFile, buffer, atau path)."""
+    file_id = getattr(src, 'file_id', None)
+    if file_id is not None:
+        with _kunci_hash:
+            digest = _hash_upload.get(file_id)
+            if digest is not None:
+                _hash_upload.move_to_end(file_id)
+                return digest
+
+    h = hashlib.sha1()
+    if hasattr(src, 'getvalue'):
+        h.update(src.getvalue())
+    elif hasattr(src, 'read'):
+        src.seek(0)
+        for blok in iter(lambda: src.read(1 << 20), b''):
+            h.update(blok)
+        src.seek(0)
+    else:
+        with open(src, 'rb') as f:
+            for blok in iter(lambda: f.read(1 << 20), b''):
+                h.update(blok)
+    digest = h.hexdigest()
+    if file_id is not None:
+        with _kunci_hash:
+            _hash_upload[file_id] = digest
+            while len(_hash_upload) > MAX_HASH_UPLOAD:
+                _hash_upload.popitem(last=False)
+    return digest
+
+
+def _nama_kunci(key):
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+class FrameCache:
+    """Cache LRU untuk DataFrame dengan spill opsional ke Parquet.
+
+    DataFrame yang dikembalikan adalah objek yang sama dengan yang tersimpan;
+    pemanggil tidak boleh mengubahnya secara in-place. Aman dipakai dari
+    beberapa thread; baca/tulis Parquet dilakukan di luar lock.
+    """
+
+    def __init__(self, max_items=MAX_ITEMS, spill_dir=None):
+        self.max_items = max_items
+        self.spill_dir = spill_dir
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.spill_dir, _nama_kunci(key) + '.parquet')
+
+    def _spill(self, key, df):
+        if not self.spill_dir:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            # Tulis ke file sementara dulu supaya sesi lain tidak membaca file setengah jadi
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception:
+            # Kolom campuran (mis. int + teks) tidak bisa ditulis ke Parquet; cukup dibuang
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get(self, key):
+        with self._lock:
+            df = self._data.get(key)
+            if df is not None:
+                self._data.move_to_end(key)
+                return df
+        if self.spill_dir and os.path.exists(self._path(key)):
+            try:
+                df = pd.read_parquet(self._path(key))
+            except (OSError, ValueError):
+                # File spill hilang / rusak di tengah jalan: anggap tidak ada di cache
+                return None
+            self.put(key, df)
+            return df
+        return None
+
+    def put(self, key, df):
+        with self._lock:
+            self._data[key] = df
+            self._data.move_to_end(key)
+            tergeser = []
+            while len(self._data) > self.max_items:
+                tergeser.append(self._data.popitem(last=False))
+        for old_key, old_df in tergeser:
+            self._spill(old_key, old_df)
+
+    def ambil_atau_hitung(self, key, fungsi):
+        """Kembalikan isi cache untuk `key`, atau jalankan `fungsi()` lalu simpan hasilnya."""
+        df = self.get(key)
+        if df is None:
+            df = fungsi()
+            self.put(key, df)
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = None
+_kunci_global = threading.Lock()
+
+
+def cache_global():
+    """Cache bersama untuk seluruh sesi dalam satu proses aplikasi."""
+    global _cache
+    with _kunci_global:
+        if _cache is None:
+            _cache = FrameCache(spill_dir=os.environ.get('FIFO_CACHE_DIR'))
+    return _cache
@@ -0,0 +1,162 @@
+"""Langkah-langkah cleaning yang dipakai tab "Data Cleaning".
+
+`selected_info` adalah daftar pengaturan kolom dari UI:
+[{'old': nama_asli, 'new': nama_baru, 'type': format}, ...]
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from diagnostik import ukur
+from ingest import CHUNK_ROWS, baca_chunk
+from tanggal import ParserTanggal, parse_tanggal
+
+FORMAT_KOLOM = ["Text", "Date", "Date Time", "Currency (Rp)", "integers", "decimal number", "Percent (%)"]
+FORMAT_ANGKA = ["integers", "decimal number", "Currency (Rp)"]
+
+
+def _dtype_baris(df):
+    # Tipe data Series baris pada df.apply(axis=1): kolom angka campuran (int + float) jadi float
+    dtypes = list(df.dtypes)
+    if all(isinstance(d, np.dtype) and d.kind in 'iuf' for d in dtypes):
+        return np.result_type(*dtypes)
+    return None
+
+
+def hapus_baris_kata(df, f_word):
+    """Buang baris yang salah satu selnya mengandung `f_word` (tidak case-sensitive, regex).
+
+    Dicek per kolom pada nilai unik saja, lalu hasilnya digabung (OR) per baris.
+    """
+    if not f_word or df.empty:
+        return df
+    mask = np.zeros(len(df), dtype=bool)
+    cast = _dtype_baris(df)
+    for j in range(df.shape[1]):
+        s = df.iloc[:, j]
+        if cast is not None:
+            s = s.astype(cast)
+        nilai = s.astype(object)
+        uniq = pd.unique(nilai.to_numpy())
+        cocok = pd.Series(uniq, dtype=object).map(str).str.contains(f_word, case=False).to_numpy(dtype=bool)
+        # Sel kosong (NaN/None) tidak pernah dianggap cocok
+        cocok = cocok & ~pd.isna(uniq)
+        if cocok.any():
+            mask |= nilai.isin(uniq[cocok]).to_numpy()
+    return df[~mask].reset_index(drop=True)
+
+
+def trim_teks(df):
+    """TRIM spasi di awal/akhir teks; hanya kolom object/string, nilai non-teks tidak diubah."""
+    df = df.copy()
+    for j in range(df.shape[1]):
+        s = df.iloc[:, j]
+        if not (s.dtype == object or pd.api.types.is_string_dtype(s.dtype)):
+            continue
+        if pd.api.types.infer_dtype(s, skipna=True) not in ('string', 'mixed', 'mixed-integer'):
+            continue
+        stripped = s.str.strip()
+        df.isetitem(j, stripped.where(stripped.notna() | s.isna(), s))
+    return df
+
+
+# Deep Clean: Menghapus titik ribuan dan Rp sebelum konversi agar tidak jadi 0
+def clean_numeric_strict(val):
+    if pd.isna(val) or val == "": return 0.0
+    s = str(val).replace('Rp', '').replace(' ', '')
+    if ',' in s and '.' in s: s = s.replace('.', '').replace(',', '.')
+    elif ',' in s: s = s.replace(',', '.')
+    s = re.sub(r'[^\d.]', '', s)
+    return pd.to_numeric(s, errors='coerce') if s != "" else 0.0
+
+
+def clean_numeric_series(series):
+    """Versi vektor dari `clean_numeric_strict` untuk satu kolom (hasil float).
+
+    Parsing dilakukan sekali per nilai unik lalu dipetakan kembali ke setiap baris.
+    """
+    codes, uniq = pd.factorize(series)
+    s = pd.Series(uniq.astype(object), dtype=object).map(str)
+    s = s.str.replace('Rp', '', regex=False).str.replace(' ', '', regex=False)
+    # Format Indonesia 1.234,56 -> buang titik ribuan; lalu koma desimal -> titik
+    dua_pemisah = s.str.contains(',', regex=False) & s.str.contains('.', regex=False)
+    s = s.where(~dua_pemisah, s.str.replace('.', '', regex=False))
+    s = s.str.replace(',', '.', regex=False).str.replace(r'[^\d.]', '', regex=True)
+    nilai = pd.to_numeric(s, errors='coerce').to_numpy(dtype=float, copy=True)
+    nilai[(s == "").to_numpy()] = 0.0
+    # Kode -1 = kosong (NaN/None) -> 0.0
+    hasil = np.where(codes >= 0, nilai[codes] if len(nilai) else 0.0, 0.0)
+    return pd.Series(hasil, index=series.index, dtype=float)
+
+
+def bersihkan(df_raw, selected_info, do_trim, parser_tanggal=None):
+    """Pilih, rename, TRIM dan ubah format kolom sesuai `selected_info`.
+
+    `parser_tanggal` = dict nama kolom -> tanggal.ParserTanggal yang dipakai ulang
+    antar chunk, supaya format tanggal dideteksi sekali per kolom.
+    """
+    cols = [i['old'] for i in selected_info]
+    names = {i['old']: i['new'] for i in selected_info}
+    df_clean = df_raw[cols].rename(columns=names).copy()
+
+    if do_trim:
+        df_clean = trim_teks(df_clean)
+
+    for i in selected_info:
+        target = i['new']
+        ft = i['type']
+
+        if ft in ("Date", "Date Time"):
+            parser = parser_tanggal.setdefault(target, ParserTanggal()) if parser_tanggal is not None else None
+            df_clean[target] = parse_tanggal(df_clean[target], parser, hanya_tanggal=(ft == "Date"))
+        elif ft in FORMAT_ANGKA:
+            df_clean[target] = clean_numeric_series(df_clean[target])
+    return df_clean
+
+
+def iter_data(src, h_row=1, d_start=None, f_word="", chunksize=CHUNK_ROWS):
+    """Iterasi data mentah per chunk: lewati baris sebelum `d_start` dan buang baris `f_word`."""
+    sisa_skip = max((d_start or h_row+1) - (h_row + 1), 0)
+    for chunk in baca_chunk(src, h_row, chunksize):
+        if sisa_skip > 0:
+            n = min(sisa_skip, len(chunk))
+            chunk = chunk.iloc[n:].reset_index(drop=True)
+            sisa_skip -= n
+        yield hapus_baris_kata(chunk, f_word)
+
+
+def baca_preview(src, h_row=1, d_start=None, f_word="", n=10):
+    """Ambil `n` baris pertama (setelah skip & filter) tanpa membaca seluruh file."""
+    potongan = []
+    total = 0
+    for chunk in iter_data(src, h_row, d_start, f_word, chunksize=max(n * 20, 200)):
+        potongan.append(chunk)
+        total += len(chunk)
+        if total >= n:
+            break
+    return pd.concat(potongan, ignore_index=True).head(n)
+
+
+def bersihkan_file(src, h_row, d_start, f_word, selected_info, do_trim, chunksize=CHUNK_ROWS, log=None):
+    """Jalankan seluruh langkah cleaning pada file sumber secara bertahap per chunk.
+
+    Dengan `log` (diagnostik.LogTahap), waktu baca+filter dan cleaning dijumlahkan per tahap.
+    """
+    hasil = []
+    parser_tanggal = {}
+    data = iter_data(src, h_row, d_start, f_word, chunksize)
+    while True:
+        with ukur(log, 'baca_filter', gabung=True) as t:
+            chunk = next(data, None)
+            t['baris'] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            break
+        with ukur(log, 'bersihkan', gabung=True) as t:
+            hasil.append(bersihkan(chunk, selected_info, do_trim, parser_tanggal))
+            t['baris'] = len(hasil[-1])
+    terisi = [df for df in hasil if not df.empty]
+    with ukur(log, 'gabung_chunk') as t:
+        df_clean = pd.concat(terisi or hasil[:1], ignore_index=True)
+        t['baris'] = len(df_clean)
+    return df_clean
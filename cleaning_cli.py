@@ -0,0 +1,116 @@
+"""CLI batch cleaning (tanpa Streamlit): satu resep untuk seluruh workbook di folder.
+
+Contoh:
+
+    python cleaning_cli.py --resep resep_masuk.json --input data_cabang/ \\
+        --output hasil_cleaning/ --format parquet --workers 8
+
+Setiap file ditulis ke `<output>/<nama file>_clean.<format>`, dan laporan per
+file (status, jumlah baris, durasi, pesan error) ditulis ke
+`<output>/laporan_cleaning.csv`. File yang gagal tidak menghentikan file lain.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from export import EKSTENSI, format_cleaning, tulis_csv, tulis_excel, tulis_parquet, SHEET_CLEANING
+from ingest import FORMAT_DIDUKUNG
+from resep import baca_resep, terapkan_resep
+
+FORMAT_OUTPUT = {'xlsx': "Excel", 'csv': "CSV", 'parquet': "Parquet"}
+KOLOM_LAPORAN = ['File', 'Status', 'Baris', 'Kolom', 'Detik', 'Output', 'Error']
+
+
+def cari_file(folder, pola=None):
+    """File sumber di `folder` (xlsx/csv/parquet, atau sesuai pola glob), urut nama."""
+    if pola:
+        paths = glob.glob(os.path.join(folder, pola))
+    else:
+        paths = [p for ext in FORMAT_DIDUKUNG for p in glob.glob(os.path.join(folder, f"*.{ext}"))]
+    # File kunci Excel (~$Book.xlsx) bukan workbook
+    return sorted(p for p in paths if os.path.isfile(p) and not os.path.basename(p).startswith('~$'))
+
+
+def tulis_hasil(df, path, fmt, selected_info):
+    if fmt == 'csv':
+        tulis_csv(df, path)
+    elif fmt == 'parquet':
+        tulis_parquet(df, path)
+    else:
+        tulis_excel(df, format_cleaning(df.columns, selected_info), SHEET_CLEANING, path)
+
+
+def _bersihkan_satu(args):
+    path, resep, folder_output, fmt = args
+    mulai = time.perf_counter()
+    laporan = {'File': os.path.basename(path), 'Status': 'OK', 'Baris': None, 'Kolom': None,
+               'Output': None, 'Error': None}
+    try:
+        df = terapkan_resep(path, resep)
+        nama = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(folder_output, f"{nama}_clean.{EKSTENSI[FORMAT_OUTPUT[fmt]]}")
+        tulis_hasil(df, target, fmt, resep['selected_info'])
+        laporan.update(Baris=len(df), Kolom=df.shape[1], Output=os.path.basename(target))
+    except KeyError as e:
+        laporan.update(Status='ERROR', Error=f"Kolom tidak ditemukan: {e}")
+    except Exception as e:
+        laporan.update(Status='ERROR', Error=f"{type(e).__name__}: {e}")
+    laporan['Detik'] = round(time.perf_counter() - mulai, 2)
+    return laporan
+
+
+def bersihkan_folder(paths, resep, folder_output, fmt='xlsx', workers=None):
+    """Bersihkan semua `paths` paralel per file; kembalikan DataFrame laporan per file."""
+    os.makedirs(folder_output, exist_ok=True)
+    tugas = [(p, resep, folder_output, fmt) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, max(len(tugas), 1))
+    if workers <= 1:
+        hasil = [_bersihkan_satu(t) for t in tugas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hasil = list(pool.map(_bersihkan_satu, tugas))
+    return pd.DataFrame(hasil, columns=KOLOM_LAPORAN).astype({'Baris': 'Int64', 'Kolom': 'Int64'})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terapkan resep cleaning ke semua workbook di satu folder.")
+    parser.add_argument('--resep', required=True, help="File resep JSON (download dari tab Data Cleaning)")
+    parser.add_argument('--input', required=True, help="Folder berisi file sumber")
+    parser.add_argument('--pola', help="Pola nama file, mis. 'masuk_*.xlsx' (default: semua xlsx/csv/parquet)")
+    parser.add_argument('--output', required=True, help="Folder hasil cleaning")
+    parser.add_argument('--format', choices=list(FORMAT_OUTPUT), default='xlsx', help="Format file hasil")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core)")
+    parser.add_argument('--laporan', help="File laporan CSV (default: <output>/laporan_cleaning.csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        resep = baca_resep(args.resep)
+    except ValueError as e:
+        print(f"Resep tidak valid: {e}", file=sys.stderr)
+        return 2
+    paths = cari_file(args.input, args.pola)
+    if not paths:
+        print(f"Tidak ada file sumber di {args.input}", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    laporan = bersihkan_folder(paths, resep, args.output, args.format, args.workers)
+    path_laporan = args.laporan or os.path.join(args.output, 'laporan_cleaning.csv')
+    laporan.to_csv(path_laporan, index=False)
+
+    gagal = laporan[laporan['Status'] != 'OK']
+    print(f"✅ {len(laporan) - len(gagal)} / {len(laporan)} file dibersihkan "
+          f"({int(laporan['Baris'].fillna(0).sum())} baris, {time.perf_counter() - t0:.1f} detik)")
+    for _, baris in gagal.iterrows():
+        print(f"❌ {baris['File']}: {baris['Error']}", file=sys.stderr)
+    print(f"Laporan: {path_laporan}")
+    return 1 if len(gagal) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
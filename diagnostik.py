@@ -0,0 +1,102 @@
+"""Catatan waktu, puncak memori dan jumlah baris per tahap proses (cleaning & FIFO).
+
+    log = LogTahap('FIFO')
+    with ukur(log, 'proses_fifo') as t:
+        raw = proses_fifo(...)
+        t['baris'] = len(raw['src'])
+
+Setiap run punya `run_id` sendiri; `ke_jsonl` menghasilkan satu baris JSON per
+tahap sehingga log beberapa run produksi bisa digabung dan dibandingkan.
+Puncak memori diukur dengan tracemalloc (alokasi Python + numpy/pandas) dan
+bisa dimatikan karena memperlambat loop Python.
+"""
+import datetime
+import json
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+
+class LogTahap:
+    """Kumpulan catatan tahap untuk satu run (satu klik Simpan Cleaning / Jalankan FIFO)."""
+
+    def __init__(self, tab, ukur_memori=True, **info):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.tab = tab
+        self.ukur_memori = ukur_memori
+        self.info = info
+        self.waktu = datetime.datetime.now().isoformat(timespec='seconds')
+        self.catatan = []
+
+    def _catatan(self, nama, gabung):
+        if gabung:
+            for rec in self.catatan:
+                if rec['tahap'] == nama:
+                    return rec
+        rec = {'run_id': self.run_id, 'waktu': self.waktu, 'tab': self.tab, 'tahap': nama,
+               'detik': 0.0, 'puncak_mb': None, 'baris': None, **self.info}
+        self.catatan.append(rec)
+        return rec
+
+    @contextmanager
+    def tahap(self, nama, gabung=False, **info):
+        """Ukur blok `with`; isi `t['baris']` (atau kunci lain) di dalam blok.
+
+        Dengan `gabung=True` pemanggilan berulang dengan nama sama (mis. per chunk)
+        dijumlahkan ke satu catatan: detik & baris ditambah, puncak memori diambil maksimum.
+        """
+        t = dict(info)
+        mulai_trace = self.ukur_memori and not tracemalloc.is_tracing()
+        if mulai_trace:
+            tracemalloc.start()
+        mulai = time.perf_counter()
+        try:
+            yield t
+        finally:
+            detik = time.perf_counter() - mulai
+            puncak = None
+            if mulai_trace:
+                puncak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+
+            rec = self._catatan(nama, gabung)
+            rec['detik'] = round(rec['detik'] + detik, 4)
+            if puncak is not None:
+                rec['puncak_mb'] = round(max(rec['puncak_mb'] or 0.0, puncak), 2)
+            baris = t.pop('baris', None)
+            if baris is not None:
+                rec['baris'] = (rec['baris'] or 0) + int(baris) if gabung else int(baris)
+            rec.update(t)
+
+    def catat(self, nama, **info):
+        """Tambah catatan tanpa mengukur (mis. hasil diambil dari cache)."""
+        rec = self._catatan(nama, False)
+        rec.update(info)
+        return rec
+
+    def ke_jsonl(self):
+        return ke_jsonl(self.catatan)
+
+
+def ke_jsonl(catatan):
+    """Satu baris JSON per catatan tahap (format JSON Lines)."""
+    return "".join(json.dumps(rec, ensure_ascii=False, default=str) + "\n" for rec in catatan)
+
+
+class _TanpaLog:
+    # Pengganti LogTahap saat instrumentasi tidak diminta; blok tetap jalan tanpa pengukuran
+    @contextmanager
+    def tahap(self, nama, gabung=False, **info):
+        yield dict(info)
+
+    def catat(self, nama, **info):
+        return dict(info)
+
+
+_TANPA_LOG = _TanpaLog()
+
+
+def ukur(log, nama, gabung=False, **info):
+    """`log.tahap(...)`, atau blok kosong jika `log` None."""
+    return (log or _TANPA_LOG).tahap(nama, gabung=gabung, **info)
@@ -0,0 +1,225 @@
+"""Ekspor hasil cleaning & FIFO ke Excel / CSV / Parquet.
+
+Number format Excel ditentukan sekali per kolom, bukan dicari ulang per sel:
+dengan XlsxWriter format dipasang per kolom, tanpa XlsxWriter dipakai workbook
+write-only openpyxl yang menulis baris secara streaming.
+Dipakai bersama oleh tombol download di app.py dan oleh CLI batch (fifo_cli.py).
+"""
+import datetime
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+try:
+    import xlsxwriter
+    _ADA_XLSXWRITER = True
+except ImportError:
+    _ADA_XLSXWRITER = False
+
+SHEET_FIFO = 'FIFO_Result'
+SHEET_CLEANING = 'Cleaned_Data'
+
+FORMAT_DOWNLOAD = ["Excel", "CSV", "Parquet"]
+MIME = {
+    "Excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "CSV": "text/csv",
+    "Parquet": "application/vnd.apache.parquet",
+}
+EKSTENSI = {"Excel": "xlsx", "CSV": "csv", "Parquet": "parquet"}
+
+# Number format Excel per tipe kolom di Pengaturan Kolom & Format
+FORMAT_EXCEL = {
+    "Date": 'dd/mm/yyyy',
+    "Date Time": 'dd/mm/yyyy hh:mm:ss',
+    "Currency (Rp)": '"Rp" #,##0.00',
+    "integers": '#,##0',
+    "decimal number": '#,##0.00',
+}
+
+
+def format_fifo(columns):
+    """Number format per kolom ledger FIFO (berdasarkan nama kolom)."""
+    formats = []
+    for col_name in columns:
+        col_name = str(col_name)
+        if col_name == 'Tanggal':
+            formats.append('dd/mm/yyyy hh:mm:ss')
+        elif any(x in col_name for x in ['Harga', 'Total', 'Nilai']):
+            formats.append('"Rp" #,##0.00')
+        elif any(x in col_name for x in ['Qty', 'Stok']):
+            formats.append('#,##0')
+        else:
+            formats.append(None)
+    return formats
+
+
+def format_cleaning(columns, selected_info):
+    """Number format per kolom hasil cleaning, dari tipe yang dipilih di `selected_info`."""
+    tipe = {}
+    for i in selected_info:
+        tipe.setdefault(i['new'], i['type'])
+    return [FORMAT_EXCEL.get(tipe.get(col_name)) for col_name in columns]
+
+
+# Format bawaan sel tanggal tanpa number format (sama dengan openpyxl / DataFrame.to_excel)
+FORMAT_TANGGAL_BAWAAN = 'yyyy-mm-dd'
+FORMAT_WAKTU_BAWAAN = 'yyyy-mm-dd h:mm:ss'
+
+
+def _format_tanggal(nilai):
+    return FORMAT_WAKTU_BAWAAN if isinstance(nilai, datetime.datetime) else FORMAT_TANGGAL_BAWAAN
+
+
+def _lengkapi_format(df, formats):
+    """Isi format kosong untuk kolom tanggal; kembalikan (formats, kolom object campuran berisi tanggal).
+
+    Tanpa number format, XlsxWriter menulis tanggal sebagai angka seri ber-format General.
+    Kolom campuran (mis. teks + tanggal) tidak diberi format kolom supaya angka di
+    dalamnya tidak tampil sebagai tanggal; sel tanggalnya diformat satu per satu.
+    """
+    formats = list(formats)
+    campur = []
+    for j, fmt in enumerate(formats):
+        if fmt:
+            continue
+        s = df.iloc[:, j]
+        if pd.api.types.is_datetime64_any_dtype(s.dtype):
+            formats[j] = FORMAT_WAKTU_BAWAAN
+        elif s.dtype == object:
+            jenis = pd.api.types.infer_dtype(s, skipna=True)
+            if jenis == 'date':
+                formats[j] = FORMAT_TANGGAL_BAWAAN
+            elif jenis == 'datetime':
+                formats[j] = FORMAT_WAKTU_BAWAAN
+            elif jenis.startswith('mixed') and s.map(lambda v: isinstance(v, datetime.date)).any():
+                campur.append(j)
+    return formats, campur
+
+
+def _nilai_kolom(series):
+    # Nilai Python siap tulis; NaN/NaT/NA jadi sel kosong
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        nilai = series.astype(object).tolist()
+    else:
+        nilai = series.to_numpy(dtype=object).tolist()
+    kosong = series.isna().to_numpy()
+    if kosong.any():
+        for r in kosong.nonzero()[0]:
+            nilai[r] = None
+    return nilai
+
+
+def _tulis_excel_xlsxwriter(df, formats, sheet_name, buffer):
+    # Format dipasang sekali per kolom (set_column); sel tanpa format memakai format kolomnya
+    book = xlsxwriter.Workbook(buffer, {'constant_memory': True, 'strings_to_formulas': False,
+                                        'strings_to_urls': False})
+    ws = book.add_worksheet(sheet_name)
+    formats, campur = _lengkapi_format(df, formats)
+    cache_fmt = {}
+    for col_idx, fmt in enumerate(formats):
+        if fmt and fmt not in cache_fmt:
+            cache_fmt[fmt] = book.add_format({'num_format': fmt})
+        ws.set_column(col_idx, col_idx, 20, cache_fmt.get(fmt))
+
+    ws.write_row(0, 0, [str(c) for c in df.columns], book.add_format({'bold': True}))
+    fmt_sel = {f: book.add_format({'num_format': f}) for f in (FORMAT_TANGGAL_BAWAAN, FORMAT_WAKTU_BAWAAN)} if campur else {}
+    kolom = [_nilai_kolom(df.iloc[:, j]) for j in range(df.shape[1])]
+    for row_idx, baris in enumerate(zip(*kolom), 1):
+        ws.write_row(row_idx, 0, baris)
+        for j in campur:
+            if isinstance(baris[j], datetime.date):
+                ws.write_datetime(row_idx, j, baris[j], fmt_sel[_format_tanggal(baris[j])])
+    book.close()
+
+
+def _tulis_excel_openpyxl(df, formats, sheet_name, buffer):
+    # Workbook write-only: baris di-stream, tanpa akses acak ws['A1'] per sel
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    for col_idx in range(1, df.shape[1] + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 20
+
+    bold = Font(bold=True)
+    header = []
+    for col_name in df.columns:
+        cell = WriteOnlyCell(ws, value=col_name)
+        cell.font = bold
+        header.append(cell)
+    ws.append(header)
+
+    kolom = [_nilai_kolom(df.iloc[:, j]) for j in range(df.shape[1])]
+    berformat = [j for j, fmt in enumerate(formats) if fmt]
+    for baris in zip(*kolom):
+        baris = list(baris)
+        for j in berformat:
+            if baris[j] is not None:
+                cell = WriteOnlyCell(ws, value=baris[j])
+                cell.number_format = formats[j]
+                baris[j] = cell
+        ws.append(baris)
+    wb.save(buffer)
+
+
+def tulis_excel(df, formats, sheet_name, target=None):
+    """Tulis `df` ke Excel dengan header bold, lebar kolom 20 dan number format per kolom.
+
+    `formats` sejajar dengan `df.columns` (None = tanpa format). Memakai XlsxWriter
+    jika terpasang (jauh lebih cepat), selain itu openpyxl write-only. Tanpa
+    `target`, kembalikan BytesIO yang siap di-download.
+    """
+    buffer = io.BytesIO() if target is None else target
+    if _ADA_XLSXWRITER:
+        _tulis_excel_xlsxwriter(df, formats, sheet_name, buffer)
+    else:
+        _tulis_excel_openpyxl(df, formats, sheet_name, buffer)
+    if target is None:
+        buffer.seek(0)
+    return buffer
+
+
+def tulis_fifo_excel(df_final, target=None):
+    """Tulis ledger FIFO dengan layout fifo_result.xlsx."""
+    return tulis_excel(df_final, format_fifo(df_final.columns), SHEET_FIFO, target)
+
+
+def tulis_csv(df, target=None):
+    buffer = io.BytesIO() if target is None else target
+    df.to_csv(buffer, index=False)
+    if target is None:
+        buffer.seek(0)
+    return buffer
+
+
+def tulis_parquet(df, target=None):
+    buffer = io.BytesIO() if target is None else target
+    try:
+        df.to_parquet(buffer, index=False)
+    except (TypeError, ValueError):
+        # Kolom object campuran (mis. angka + teks) tidak didukung Parquet; simpan sebagai teks
+        df = df.copy()
+        for j in range(df.shape[1]):
+            s = df.iloc[:, j]
+            if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in ('mixed', 'mixed-integer'):
+                df.isetitem(j, s.where(s.isna(), s.astype(str)))
+        if target is None:
+            buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+    if target is None:
+        buffer.seek(0)
+    return buffer
+
+
+def siapkan_download(df, jenis, formats, sheet_name, nama):
+    """Kembalikan (data, file_name, mime) untuk st.download_button sesuai `jenis` file."""
+    if jenis == "CSV":
+        data = tulis_csv(df)
+    elif jenis == "Parquet":
+        data = tulis_parquet(df)
+    else:
+        data = tulis_excel(df, formats, sheet_name)
+        jenis = "Excel"
+    return data, f"{nama}.{EKSTENSI[jenis]}", MIME[jenis]
@@ -0,0 +1,108 @@
+"""CLI batch FIFO (tanpa Streamlit), diproses paralel per kelompok produk.
+
+Contoh:
+
+    python fifo_cli.py --so cleaned_so.xlsx --masuk cleaned_masuk.xlsx \\
+        --keluar cleaned_keluar.xlsx --config mapping.json --workers 8 \\
+        --output fifo_result.xlsx
+
+Format mapping.json (kunci mapping sama dengan widget di tab Integrasi FIFO):
+
+    {
+      "mapping": {"p_so": "Kode", "q_so": "Qty", "h_so": "Harga", ...},
+      "opt_configs": [{"label": "Info_1", "so": "-", "in": "Supplier", "out": "Customer"}]
+    }
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from export import tulis_fifo_excel, tulis_parquet
+from fifo_engine import (MAPPING_KEYS, gabung_ledger, gabung_sisa, partisi_produk, proses_fifo,
+                         siapkan_inventory, siapkan_keluar, susun_ledger, susun_sisa, validasi_mapping)
+from ingest import baca_tabel
+
+
+def baca_config(path):
+    with open(path, encoding='utf-8') as f:
+        cfg = json.load(f)
+    mapping = {k: cfg.get('mapping', {}).get(k, '-') for k in MAPPING_KEYS}
+    opt_configs = [
+        {'label': oc['label'], 'so': oc.get('so', '-'), 'in': oc.get('in', '-'), 'out': oc.get('out', '-')}
+        for oc in cfg.get('opt_configs', [])
+    ]
+    return mapping, opt_configs
+
+
+def _jalankan_shard(args):
+    inv, kolom_produk, d_out, kolom_keluar, opt_configs = args
+    raw = proses_fifo(inv, kolom_produk, d_out, kolom_keluar)
+    return susun_ledger(raw, inv, d_out, opt_configs), susun_sisa(raw, inv, opt_configs)
+
+
+def run_fifo_paralel(so, masuk, keluar, mapping, opt_configs, workers=None, shards=None, snapshot=None):
+    """Sama seperti fifo_engine.run_fifo_lengkap, tapi produk dibagi ke beberapa proses.
+
+    Kembalikan (df_final, df_sisa).
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers
+
+    # Persiapan (tanggal SO, urutan inventory) tetap global agar hasil identik dengan run_fifo
+    inv, kolom_produk = siapkan_inventory(so, masuk, mapping, snapshot)
+    d_out = siapkan_keluar(keluar, mapping)
+    tugas = [(inv_i, kolom_produk, out_i, mapping['p_out'], opt_configs)
+             for inv_i, out_i in partisi_produk(inv, kolom_produk, d_out, mapping['p_out'], shards)]
+
+    if workers <= 1 or len(tugas) <= 1:
+        hasil = [_jalankan_shard(t) for t in tugas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hasil = list(pool.map(_jalankan_shard, tugas))
+    return gabung_ledger([h[0] for h in hasil]), gabung_sisa([h[1] for h in hasil])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan Core FIFO dari file hasil cleaning.")
+    parser.add_argument('--so', help="File SO / Stok Awal (xlsx/csv/parquet)")
+    parser.add_argument('--masuk', help="File Barang Masuk (xlsx/csv/parquet)")
+    parser.add_argument('--keluar', required=True, help="File Barang Keluar (xlsx/csv/parquet)")
+    parser.add_argument('--snapshot', help="Snapshot sisa lot periode sebelumnya (parquet/csv)")
+    parser.add_argument('--config', required=True, help="JSON berisi 'mapping' dan 'opt_configs'")
+    parser.add_argument('--output', default='fifo_result.xlsx', help="File hasil (default: fifo_result.xlsx)")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core)")
+    parser.add_argument('--shards', type=int, default=None, help="Jumlah kelompok produk (default: = workers)")
+    parser.add_argument('--snapshot-out', help="Tulis snapshot sisa lot akhir periode ke file parquet ini")
+    args = parser.parse_args(argv)
+
+    if args.so is None and args.masuk is None and args.snapshot is None:
+        parser.error("Minimal harus ada (SO + Keluar), (Masuk + Keluar) atau (Snapshot + Keluar).")
+
+    mapping, opt_configs = baca_config(args.config)
+    errors = validasi_mapping(mapping, args.so is not None, args.masuk is not None)
+    if errors:
+        for err in errors:
+            print(f"- {err}", file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    df_final, df_sisa = run_fifo_paralel(baca_tabel(args.so), baca_tabel(args.masuk), baca_tabel(args.keluar),
+                                         mapping, opt_configs, workers=args.workers, shards=args.shards,
+                                         snapshot=baca_tabel(args.snapshot))
+    if df_final.empty:
+        print("Tidak ada transaksi untuk diproses.", file=sys.stderr)
+        return 1
+
+    tulis_fifo_excel(df_final, args.output)
+    print(f"✅ {len(df_final)} baris ledger ditulis ke {args.output} ({time.perf_counter() - t0:.1f} detik)")
+    if args.snapshot_out:
+        tulis_parquet(df_sisa, args.snapshot_out)
+        print(f"✅ {len(df_sisa)} lot tersisa ditulis ke {args.snapshot_out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,522 @@
+"""Core FIFO headless (tanpa Streamlit).
+
+Dipakai oleh tab "Integrasi FIFO" di app.py dan bisa di-import langsung:
+
+    from fifo_engine import run_fifo
+    df_final = run_fifo(df_so, df_masuk, df_keluar, mapping, opt_configs)
+
+`mapping` memakai kunci yang sama dengan widget mapping di UI:
+p_so, q_so, h_so, t_in, p_in, q_in, h_in, t_out, p_out, q_out.
+
+Untuk ledger besar, `run_fifo_ringkas` mengembalikan `LedgerRingkas` (Produk &
+Keterangan kategori, kolom tambahan sebagai referensi baris sumber) yang baru
+dilengkapi saat ditampilkan atau diekspor.
+"""
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from diagnostik import ukur
+from tanggal import pastikan_tanggal
+
+MAPPING_KEYS = ['p_so', 'q_so', 'h_so', 't_in', 'p_in', 'q_in', 'h_in', 't_out', 'p_out', 'q_out']
+
+KET_SALDO = 'SALDO AWAL'
+KET_MASUK = 'BARANG MASUK'
+KET_KELUAR = 'BARANG KELUAR'
+KET_OOS = 'OUT OF STOCK'
+KET_AKHIR = 'STOK SEKARANG'
+KET_AKHIR_OOS = 'STOK SEKARANG (OUT OF STOCK)'
+
+# Keterangan disimpan sebagai kategori; kode = posisi di daftar ini
+KATEGORI_KET = [KET_SALDO, KET_MASUK, KET_KELUAR, KET_OOS, KET_AKHIR, KET_AKHIR_OOS]
+_KODE_KET = {ket: i for i, ket in enumerate(KATEGORI_KET)}
+
+# Kode sumber baris ledger: dari tabel inventory (SO + Masuk) atau dari tabel Keluar
+SRC_INV = 0
+SRC_OUT = 1
+
+# Nilai kolom SOURCE di tabel inventory
+SOURCE_SNAPSHOT = -1
+SOURCE_SO = 0
+SOURCE_MASUK = 1
+
+# Referensi baris sumber kolom tambahan di ledger ringkas: posisi di inventory,
+# atau len(inventory) + posisi di tabel Keluar
+KOLOM_REF = '_ref'
+
+# Kolom file snapshot lot; kolom lain di snapshot = label kolom tambahan
+SNAPSHOT_KOLOM = ['Produk', 'Tanggal', 'Qty', 'Harga']
+_PREFIX_SNAPSHOT = 'SNAPSHOT::'
+
+
+def validasi_mapping(mapping, ada_so, ada_masuk):
+    """Kembalikan daftar pesan error untuk mapping wajib yang masih '-'."""
+    errors = []
+    wajib = []
+    if ada_so:
+        wajib += [('p_so', "Produk (SO)"), ('q_so', "Qty (SO)"), ('h_so', "Harga Satuan (SO)")]
+    if ada_masuk:
+        wajib += [('t_in', "Tanggal (Masuk)"), ('p_in', "Produk (Masuk)"),
+                  ('q_in', "Qty (Masuk)"), ('h_in', "Harga Satuan (Masuk)")]
+    wajib += [('t_out', "Tanggal (Keluar)"), ('p_out', "Produk (Keluar)"), ('q_out', "Qty (Keluar)")]
+    for key, label in wajib:
+        if mapping.get(key, '-') == '-':
+            errors.append(f"{label} tidak boleh '-'")
+    return errors
+
+
+def kolom_dipakai(mapping, opt_configs):
+    """Kolom yang dibutuhkan FIFO per tabel ({'SO': [...], 'Masuk': [...], 'Keluar': [...]})."""
+    sumber = {
+        'SO': [mapping['p_so'], mapping['q_so'], mapping['h_so']] + [oc['so'] for oc in opt_configs],
+        'Masuk': [mapping['t_in'], mapping['p_in'], mapping['q_in'], mapping['h_in']] + [oc['in'] for oc in opt_configs],
+        'Keluar': [mapping['t_out'], mapping['p_out'], mapping['q_out']] + [oc['out'] for oc in opt_configs],
+    }
+    return {jenis: list(dict.fromkeys(c for c in cols if c != '-')) for jenis, cols in sumber.items()}
+
+
+def siapkan_inventory(so, masuk, mapping, snapshot=None):
+    """Gabungkan SO + Masuk jadi satu tabel inventory terurut (TGL_FIFO, SOURCE).
+
+    Lot dari `snapshot` (sisa antrean periode sebelumnya) diletakkan paling depan
+    dengan urutan aslinya. Kembalikan (inv_merged, kolom_produk).
+    """
+    if masuk is not None:
+        d_in = masuk.copy()
+        d_in['TGL_FIFO'] = pastikan_tanggal(d_in[mapping['t_in']])
+        d_in['QTY_FIFO'] = pd.to_numeric(d_in[mapping['q_in']]).fillna(0)
+        d_in['PRC_FIFO'] = pd.to_numeric(d_in[mapping['h_in']]).fillna(0)
+        d_in['SOURCE'] = SOURCE_MASUK
+    else: d_in = pd.DataFrame()
+
+    if so is not None:
+        d_so = so.copy()
+        ref_y = d_in['TGL_FIFO'].dt.year.min() if not d_in.empty else pd.Timestamp.now().year
+        d_so['TGL_FIFO'] = pd.Timestamp(year=int(ref_y)-1, month=12, day=31)
+        d_so['QTY_FIFO'] = pd.to_numeric(d_so[mapping['q_so']]).fillna(0)
+        d_so['PRC_FIFO'] = pd.to_numeric(d_so[mapping['h_so']]).fillna(0)
+        d_so['SOURCE'] = SOURCE_SO
+    else: d_so = pd.DataFrame()
+
+    if d_so.empty and d_in.empty and 'TGL_FIFO' not in d_in.columns:
+        inv_merged = pd.DataFrame(columns=['TGL_FIFO', 'QTY_FIFO', 'PRC_FIFO', 'SOURCE'])
+    else:
+        inv_merged = pd.concat([d_so, d_in], ignore_index=True).sort_values(['TGL_FIFO', 'SOURCE'])
+        inv_merged = inv_merged.reset_index(drop=True)
+    kolom_produk = mapping['p_in'] if not d_in.empty else mapping['p_so']
+
+    if snapshot is not None and not snapshot.empty:
+        if kolom_produk == '-':
+            kolom_produk = 'Produk'
+        d_snap = pd.DataFrame({
+            kolom_produk: snapshot['Produk'].to_numpy(),
+            'TGL_FIFO': pastikan_tanggal(snapshot['Tanggal']).to_numpy(),
+            'QTY_FIFO': pd.to_numeric(snapshot['Qty']).fillna(0).to_numpy(),
+            'PRC_FIFO': pd.to_numeric(snapshot['Harga']).fillna(0).to_numpy(),
+            'SOURCE': SOURCE_SNAPSHOT,
+        })
+        for label in snapshot.columns:
+            if label not in SNAPSHOT_KOLOM:
+                d_snap[_PREFIX_SNAPSHOT + str(label)] = snapshot[label].to_numpy()
+        inv_merged = pd.concat([d_snap, inv_merged], ignore_index=True)
+    return inv_merged, kolom_produk
+
+
+def siapkan_keluar(keluar, mapping):
+    d_out = keluar.copy()
+    d_out['TGL_FIFO'] = pastikan_tanggal(d_out[mapping['t_out']])
+    d_out['QTY_FIFO'] = pd.to_numeric(d_out[mapping['q_out']]).fillna(0)
+    # Stable: transaksi di tanggal yang sama diproses sesuai urutan file, sehingga
+    # run per periode (dengan snapshot) sama dengan run seluruh histori
+    return d_out.sort_values(by=['TGL_FIFO'], kind='stable').reset_index(drop=True)
+
+
+def _label_opt(opt_configs):
+    # Label duplikat: posisi kolom dari kemunculan pertama, sumber dari config terakhir
+    labels = {}
+    for oc in opt_configs:
+        labels[oc['label']] = oc
+    return labels
+
+
+def _kolom_opt_inventory(inv, oc):
+    if inv.empty:
+        return np.empty(0, dtype=object)
+    hasil = np.full(len(inv), pd.NA, dtype=object)
+    source = inv['SOURCE'].to_numpy()
+    sumber = ((SOURCE_SO, oc['so']), (SOURCE_MASUK, oc['in']), (SOURCE_SNAPSHOT, _PREFIX_SNAPSHOT + str(oc['label'])))
+    for src, col in sumber:
+        if col != "-" and col in inv.columns:
+            pilih = source == src
+            hasil[pilih] = inv[col].to_numpy(dtype=object)[pilih]
+    return hasil
+
+
+def _kolom_opt_keluar(d_out, oc):
+    col = oc['out']
+    if col == "-" or col not in d_out.columns:
+        return np.full(len(d_out), pd.NA, dtype=object)
+    return d_out[col].to_numpy(dtype=object)
+
+
+def _indeks_produk(series):
+    # Posisi baris per produk, urutan asli dipertahankan (NaN dibuang)
+    if series is None or series.empty:
+        return {}
+    return series.groupby(series, sort=False).indices
+
+
+def proses_fifo(inv, kolom_produk, d_out, kolom_keluar, progres=None):
+    """Jalankan antrean FIFO per produk.
+
+    Kembalikan dict array kolom ledger mentah (belum diurutkan) dengan referensi
+    baris sumber di `src`/`idx` untuk kolom tambahan. Produk & Keterangan sudah
+    berupa Categorical; angka disimpan di array lebar tetap, bukan list objek.
+    Sisa antrean tiap produk ada di `sisa` (produk, qty, harga, posisi baris inventory).
+    `progres(selesai, total)` dipanggil berkala per kelompok produk (mis. untuk progress bar).
+    """
+    prod_inv = _indeks_produk(inv[kolom_produk]) if not inv.empty else {}
+    prod_out = _indeks_produk(d_out[kolom_keluar])
+    prod_keys = [k for k in set(prod_inv).union(prod_out) if not (pd.isna(k) or k == "-")]
+    try:
+        prod_keys.sort()
+    except TypeError:
+        pass  # kode produk campuran (angka & teks): urutan kategori apa adanya
+
+    inv_tgl = inv['TGL_FIFO'].to_numpy() if not inv.empty else None
+    inv_qty = inv['QTY_FIFO'].to_numpy(dtype=float) if not inv.empty else None
+    inv_prc = inv['PRC_FIFO'].to_numpy(dtype=float) if not inv.empty else None
+    inv_ket = (np.where(inv['SOURCE'].to_numpy() == SOURCE_SNAPSHOT, _KODE_KET[KET_SALDO], _KODE_KET[KET_MASUK])
+               if not inv.empty else None)
+    k_keluar = _KODE_KET[KET_KELUAR]; k_oos = _KODE_KET[KET_OOS]
+    out_tgl = d_out['TGL_FIFO'].to_numpy()
+    out_qty = d_out['QTY_FIFO'].to_numpy(dtype=float)
+
+    produk, src, idx, ket = array('i'), array('b'), array('q'), array('b')
+    qty_in, prc_in, qty_out, prc_out = array('d'), array('d'), array('d'), array('d')
+    sisa_produk, sisa_qty, sisa_prc, sisa_pos = array('i'), array('d'), array('d'), array('q')
+    kosong = np.empty(0, dtype=np.intp)
+    langkah = max(len(prod_keys) // 100, 1)
+
+    for i_prod, kode in enumerate(prod_keys):
+        if progres is not None and i_prod % langkah == 0:
+            progres(i_prod, len(prod_keys))
+        # Antrean lot: [qty, harga, posisi baris inventory]
+        stok_antrean = deque()
+        pos_masuk = prod_inv.get(kode, kosong)
+        pos_keluar = prod_out.get(kode, kosong)
+
+        # Proses Barang Masuk (SO + Masuk)
+        for p in pos_masuk:
+            q = inv_qty[p]; h = inv_prc[p]
+            stok_antrean.append([q, h, p])
+            produk.append(i_prod); src.append(SRC_INV); idx.append(p)
+            qty_in.append(q); prc_in.append(h); qty_out.append(0.0); prc_out.append(0.0)
+            ket.append(inv_ket[p])
+
+        # Proses Barang Keluar
+        for p in pos_keluar:
+            qty_perlu = out_qty[p]
+            while qty_perlu > 0:
+                if not stok_antrean:
+                    ambil = qty_perlu; hna = 0.0; k = k_oos
+                    qty_perlu = 0
+                else:
+                    lot = stok_antrean[0]
+                    hna = lot[1]; k = k_keluar
+                    if lot[0] <= qty_perlu:
+                        ambil = lot[0]; qty_perlu -= ambil
+                        stok_antrean.popleft()
+                    else:
+                        ambil = qty_perlu; qty_perlu = 0
+                        lot[0] -= ambil
+                produk.append(i_prod); src.append(SRC_OUT); idx.append(p)
+                qty_in.append(0.0); prc_in.append(0.0); qty_out.append(ambil); prc_out.append(hna)
+                ket.append(k)
+
+        for q, h, p in stok_antrean:
+            sisa_produk.append(i_prod); sisa_qty.append(q); sisa_prc.append(h); sisa_pos.append(p)
+
+    src = np.frombuffer(src, dtype=np.int8)
+    idx = np.frombuffer(idx, dtype=np.int64).astype(np.intp, copy=False)
+    tgl_dtype = np.promote_types(out_tgl.dtype, inv_tgl.dtype) if inv_tgl is not None else out_tgl.dtype
+    tanggal = np.empty(len(src), dtype=tgl_dtype)
+    dari_inv = src == SRC_INV
+    if dari_inv.any():
+        tanggal[dari_inv] = inv_tgl[idx[dari_inv]]
+    tanggal[~dari_inv] = out_tgl[idx[~dari_inv]]
+
+    kategori_produk = pd.Index(prod_keys, dtype=object)
+    return {
+        'Tanggal': tanggal,
+        'Produk': pd.Categorical.from_codes(np.frombuffer(produk, dtype=np.int32), categories=kategori_produk),
+        'src': src,
+        'idx': idx,
+        'Qty Masuk': np.frombuffer(qty_in, dtype=float),
+        'Harga Satuan Masuk': np.frombuffer(prc_in, dtype=float),
+        'Qty Keluar': np.frombuffer(qty_out, dtype=float),
+        'Harga Satuan Keluar': np.frombuffer(prc_out, dtype=float),
+        'Keterangan': pd.Categorical.from_codes(np.frombuffer(ket, dtype=np.int8), categories=KATEGORI_KET),
+        'sisa': {
+            'Produk': kategori_produk.to_numpy()[np.frombuffer(sisa_produk, dtype=np.int32)],
+            'Qty': np.frombuffer(sisa_qty, dtype=float),
+            'Harga': np.frombuffer(sisa_prc, dtype=float),
+            'pos': np.frombuffer(sisa_pos, dtype=np.int64).astype(np.intp, copy=False),
+        },
+    }
+
+
+@dataclass
+class LedgerRingkas:
+    """Ledger FIFO ringkas: kolom angka + Produk/Keterangan kategori, tanpa kolom tambahan.
+
+    Kolom tambahan disimpan sekali per baris sumber (SO/Masuk/Keluar) di `opsional`
+    dan ledger hanya menyimpan posisinya (`KOLOM_REF`). Satu baris Keluar yang
+    memecah beberapa lot tidak lagi menyalin nilainya berkali-kali; kolom baru
+    diisi saat ledger ditampilkan / diekspor lewat `lengkap()`.
+    """
+    df: pd.DataFrame
+    opsional: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def lengkap(self, df=None):
+        """Ledger dengan kolom tambahan terisi (kolom sama dengan fifo_result.xlsx).
+
+        `df` = potongan dari `self.df` (mis. satu halaman / hasil filter); default seluruh ledger.
+        """
+        df = self.df if df is None else df
+        if df.empty and KOLOM_REF not in df.columns:
+            return df
+        ref = df[KOLOM_REF].to_numpy()
+        hasil = df.drop(columns=[KOLOM_REF])
+        posisi = hasil.columns.get_loc('Produk') + 1
+        for label, nilai in self.opsional.items():
+            if label in hasil.columns:
+                # Label sama dengan kolom ledger: nilai ledger yang dipakai, hanya posisinya pindah
+                if label not in ('Tanggal', 'Produk'):
+                    hasil.insert(posisi, label, hasil.pop(label))
+                    posisi += 1
+                continue
+            kolom = nilai.take(ref)
+            if isinstance(kolom.dtype, pd.CategoricalDtype):
+                kolom = kolom.astype(kolom.cat.categories.dtype)
+            hasil.insert(posisi, label, pd.Series(kolom.to_numpy(), index=df.index, dtype=kolom.dtype).infer_objects())
+            posisi += 1
+        return hasil
+
+
+def referensi_opsional(inv, d_out, opt_configs):
+    """Nilai kolom tambahan per baris sumber: {label: Series inventory + Keluar}.
+
+    Series diberi dtype sebenarnya (str/angka/tanggal), dan disimpan sebagai
+    kategori jika nilainya banyak berulang (mis. kode gudang, nama supplier).
+    """
+    hasil = {}
+    for label, oc in _label_opt(opt_configs).items():
+        nilai = pd.Series(np.concatenate([_kolom_opt_inventory(inv, oc), _kolom_opt_keluar(d_out, oc)])).infer_objects()
+        if nilai.dtype != object and nilai.nunique() < len(nilai) // 2:
+            nilai = nilai.astype('category')
+        hasil[label] = nilai
+    return hasil
+
+
+def bangun_ledger(raw, inv):
+    """Bangun DataFrame ledger ringkas (belum diurutkan, tanpa Stok) dari array mentah."""
+    if len(raw['src']) == 0:
+        return pd.DataFrame()
+
+    src = raw['src']
+    kolom = {
+        'Tanggal': raw['Tanggal'],
+        'Produk': raw['Produk'],
+        KOLOM_REF: np.where(src == SRC_INV, raw['idx'], raw['idx'] + len(inv)).astype(
+            np.int32 if len(inv) + len(raw['idx']) < np.iinfo(np.int32).max else np.int64),
+        'Qty Masuk': raw['Qty Masuk'],
+        'Harga Satuan Masuk': raw['Harga Satuan Masuk'],
+        'Total Masuk': raw['Qty Masuk'] * raw['Harga Satuan Masuk'],
+        'Qty Keluar': raw['Qty Keluar'],
+        'Harga Satuan Keluar': raw['Harga Satuan Keluar'],
+        'Total Keluar': raw['Qty Keluar'] * raw['Harga Satuan Keluar'],
+        'Keterangan': raw['Keterangan'],
+    }
+    return pd.DataFrame(kolom)
+
+
+def susun_ledger_ringkas(raw, inv, d_out, opt_configs):
+    """Ledger ringkas dengan Stok/Nilai Stok; kolom tambahan masih berupa referensi."""
+    df_final = bangun_ledger(raw, inv)
+    if not df_final.empty:
+        df_final = hitung_stok(df_final)
+    return LedgerRingkas(df_final, referensi_opsional(inv, d_out, opt_configs))
+
+
+def susun_ledger(raw, inv, d_out, opt_configs):
+    """Bangun DataFrame ledger lengkap (kolom tambahan terisi) dan hitung Stok."""
+    return susun_ledger_ringkas(raw, inv, d_out, opt_configs).lengkap()
+
+
+def susun_sisa(raw, inv, opt_configs):
+    """Bangun snapshot lot yang tersisa di antrean tiap produk (urutan FIFO dipertahankan).
+
+    Kolom: Produk, Tanggal, Qty, Harga, lalu label kolom tambahan dari baris
+    inventory asal lot. Snapshot ini bisa dipakai sebagai `snapshot` run berikutnya.
+    """
+    sisa = raw['sisa']
+    pos = sisa['pos']
+    kolom = {
+        'Produk': sisa['Produk'],
+        'Tanggal': inv['TGL_FIFO'].to_numpy()[pos] if len(pos) else np.array([], dtype='datetime64[ns]'),
+        'Qty': sisa['Qty'],
+        'Harga': sisa['Harga'],
+    }
+    for label, oc in _label_opt(opt_configs).items():
+        if label in SNAPSHOT_KOLOM: continue
+        kolom[label] = _kolom_opt_inventory(inv, oc)[pos] if len(pos) else np.empty(0, dtype=object)
+    df_sisa = pd.DataFrame(kolom).sort_values('Produk', kind='stable').reset_index(drop=True)
+    for label in df_sisa.columns[len(SNAPSHOT_KOLOM):]:
+        df_sisa[label] = df_sisa[label].infer_objects()
+    return df_sisa
+
+
+def hitung_stok(df_final):
+    """Urutkan per (Produk, Tanggal), hitung Stok/Nilai Stok kumulatif dan tandai baris terakhir."""
+    df_final = df_final.sort_values(by=['Produk', 'Tanggal']).reset_index(drop=True)
+    grp = df_final.groupby('Produk', sort=False, observed=True)
+    df_final['Stok'] = grp['Qty Masuk'].cumsum() - grp['Qty Keluar'].cumsum()
+    df_final['Nilai Stok'] = grp['Total Masuk'].cumsum() - grp['Total Keluar'].cumsum()
+
+    # Update Keterangan untuk baris terakhir per produk
+    is_last = (grp.cumcount(ascending=False) == 0).to_numpy()
+    kode = pd.Categorical(df_final['Keterangan'], categories=KATEGORI_KET).codes.copy()
+    oos = kode == _KODE_KET[KET_OOS]
+    kode[is_last & oos] = _KODE_KET[KET_AKHIR_OOS]
+    kode[is_last & ~oos] = _KODE_KET[KET_AKHIR]
+    df_final['Keterangan'] = pd.Categorical.from_codes(kode, categories=KATEGORI_KET)
+    return df_final
+
+
+def partisi_produk(inv, kolom_produk, d_out, kolom_keluar, n_shard):
+    """Bagi inventory & keluar yang sudah disiapkan menjadi `n_shard` kelompok produk.
+
+    Setiap produk punya antrean sendiri, jadi shard bisa diproses terpisah. Produk
+    dibagi berdasarkan jumlah baris (terbesar dulu ke shard teringan) supaya beban
+    worker seimbang. Kembalikan list (inv_shard, out_shard); shard kosong dibuang.
+    """
+    kunci_inv = inv[kolom_produk] if not inv.empty else pd.Series(dtype=object)
+    kunci_out = d_out[kolom_keluar]
+    jumlah = {}
+    for kunci in (kunci_inv, kunci_out):
+        for kode, n in kunci.value_counts(sort=False).items():
+            if pd.isna(kode) or kode == "-": continue
+            jumlah[kode] = jumlah.get(kode, 0) + n
+
+    beban = [0] * max(int(n_shard), 1)
+    shard_of = {}
+    for kode, n in sorted(jumlah.items(), key=lambda x: -x[1]):
+        i = beban.index(min(beban))
+        shard_of[kode] = i
+        beban[i] += n
+
+    id_inv = kunci_inv.map(shard_of).to_numpy() if not inv.empty else None
+    id_out = kunci_out.map(shard_of).to_numpy()
+    hasil = []
+    for i, b in enumerate(beban):
+        if b == 0: continue
+        inv_i = inv[id_inv == i].reset_index(drop=True) if id_inv is not None else inv
+        out_i = d_out[id_out == i].reset_index(drop=True)
+        hasil.append((inv_i, out_i))
+    return hasil
+
+
+def gabung_ledger(ledgers):
+    """Gabungkan ledger per shard (masing-masing sudah dihitung Stok-nya) jadi satu."""
+    ledgers = [df for df in ledgers if not df.empty]
+    if not ledgers:
+        return pd.DataFrame()
+    df_final = pd.concat(ledgers, ignore_index=True)
+    # Kategori Produk tiap shard berbeda sehingga concat menjadi object; satukan lagi
+    df_final['Produk'] = df_final['Produk'].astype('category')
+    return df_final.sort_values(by=['Produk', 'Tanggal']).reset_index(drop=True)
+
+
+def gabung_sisa(daftar_sisa):
+    """Gabungkan snapshot sisa lot per shard, urut per Produk (urutan antrean tetap)."""
+    ada = [df for df in daftar_sisa if not df.empty]
+    if not ada:
+        # Semua lot habis: kolom tambahan tetap ada, sama seperti susun_sisa satu proses
+        return daftar_sisa[0] if daftar_sisa else pd.DataFrame(columns=SNAPSHOT_KOLOM)
+    return pd.concat(ada, ignore_index=True).sort_values('Produk', kind='stable').reset_index(drop=True)
+
+
+def run_fifo_ringkas(so: pd.DataFrame | None, masuk: pd.DataFrame | None, keluar: pd.DataFrame,
+                     mapping: dict, opt_configs: list,
+                     snapshot: pd.DataFrame | None = None, log=None,
+                     progres=None) -> tuple[LedgerRingkas, pd.DataFrame]:
+    """Seperti `run_fifo_lengkap`, tapi ledger dikembalikan sebagai `LedgerRingkas`.
+
+    Dipakai app.py supaya ledger besar tetap ringkas di memori sesi; kolom
+    tambahan baru diisi per halaman tampilan atau saat ekspor.
+    Jika `log` (diagnostik.LogTahap) diberikan, tiap tahap dicatat waktunya;
+    `progres` diteruskan ke `proses_fifo`.
+    """
+    with ukur(log, 'siapkan_inventory') as t:
+        inv, kolom_produk = siapkan_inventory(so, masuk, mapping, snapshot)
+        t['baris'] = len(inv)
+    with ukur(log, 'siapkan_keluar') as t:
+        d_out = siapkan_keluar(keluar, mapping)
+        t['baris'] = len(d_out)
+    with ukur(log, 'proses_fifo') as t:
+        raw = proses_fifo(inv, kolom_produk, d_out, mapping['p_out'], progres)
+        t['baris'] = len(raw['src'])
+    with ukur(log, 'bangun_ledger') as t:
+        df_final = bangun_ledger(raw, inv)
+        t['baris'] = len(df_final)
+    with ukur(log, 'hitung_stok') as t:
+        if not df_final.empty:
+            df_final = hitung_stok(df_final)
+        t['baris'] = len(df_final)
+    with ukur(log, 'referensi_opsional') as t:
+        ledger = LedgerRingkas(df_final, referensi_opsional(inv, d_out, opt_configs))
+        t['baris'] = len(inv) + len(d_out)
+    with ukur(log, 'susun_sisa') as t:
+        df_sisa = susun_sisa(raw, inv, opt_configs)
+        t['baris'] = len(df_sisa)
+    return ledger, df_sisa
+
+
+def run_fifo_lengkap(so: pd.DataFrame | None, masuk: pd.DataFrame | None, keluar: pd.DataFrame,
+                     mapping: dict, opt_configs: list,
+                     snapshot: pd.DataFrame | None = None, log=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Seperti `run_fifo`, tapi juga mengembalikan snapshot sisa lot: (df_final, df_sisa).
+
+    Dengan `snapshot` dari periode sebelumnya, cukup kirim transaksi periode baru;
+    lot lama masuk ledger sebagai baris 'SALDO AWAL' dan dikonsumsi lebih dulu.
+    """
+    ledger, df_sisa = run_fifo_ringkas(so, masuk, keluar, mapping, opt_configs, snapshot, log)
+    with ukur(log, 'lengkapi_ledger') as t:
+        df_final = ledger.lengkap()
+        t['baris'] = len(df_final)
+    return df_final, df_sisa
+
+
+def run_fifo(so: pd.DataFrame | None, masuk: pd.DataFrame | None, keluar: pd.DataFrame,
+             mapping: dict, opt_configs: list, snapshot: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Hitung ledger FIFO lengkap (kolom sama dengan fifo_result.xlsx).
+
+    Minimal harus ada (SO + Keluar), (Masuk + Keluar) atau (snapshot + Keluar).
+    Kembalikan DataFrame kosong jika tidak ada transaksi sama sekali.
+    """
+    inv, kolom_produk = siapkan_inventory(so, masuk, mapping, snapshot)
+    d_out = siapkan_keluar(keluar, mapping)
+    raw = proses_fifo(inv, kolom_produk, d_out, mapping['p_out'])
+    return susun_ledger(raw, inv, d_out, opt_configs)
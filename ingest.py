@@ -0,0 +1,129 @@
+"""Pembaca file sumber secara streaming (xlsx / csv / parquet).
+
+File dibaca per potongan (chunk) sehingga preview di tab Data Cleaning hanya
+membaca baris awal, dan proses "Simpan Cleaning" tidak perlu memuat seluruh
+workbook sekaligus. Hasil per chunk mengikuti aturan `pd.read_excel(header=...)`
+(nama kolom "Unnamed: n", kolom duplikat "X.1", inferensi tipe data).
+"""
+import os
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+FORMAT_DIDUKUNG = ['xlsx', 'csv', 'parquet']
+CHUNK_ROWS = 50_000
+
+
+def jenis_file(src):
+    """Tebak format dari nama file (path atau UploadedFile Streamlit)."""
+    name = getattr(src, 'name', src)
+    ext = os.path.splitext(str(name))[1].lower().lstrip('.')
+    return ext if ext in FORMAT_DIDUKUNG else 'xlsx'
+
+
+def _rewind(src):
+    if hasattr(src, 'seek'):
+        src.seek(0)
+
+
+def _convert_cell(cell):
+    # Sama dengan konversi sel pada reader openpyxl milik pandas
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+    if cell.value is None:
+        return ""
+    elif cell.data_type == TYPE_ERROR:
+        return np.nan
+    elif cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def _iter_baris_excel(src):
+    from openpyxl import load_workbook
+    _rewind(src)
+    wb = load_workbook(src, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        kosong = []
+        for row in ws.iter_rows():
+            baris = [_convert_cell(c) for c in row]
+            while baris and baris[-1] == "":
+                baris.pop()
+            if not baris:
+                # Baris kosong di akhir sheet dibuang (seperti read_excel)
+                kosong.append(baris)
+                continue
+            yield from kosong
+            kosong = []
+            yield baris
+    finally:
+        wb.close()
+
+
+def _chunk_excel(src, h_row, chunksize):
+    rows = _iter_baris_excel(src)
+    prefix = list(islice(rows, h_row))
+    if not prefix:
+        yield pd.DataFrame()
+        return
+    batch = list(islice(rows, chunksize))
+    # Lebar tabel = baris terlebar di header & batch pertama, seperti read_excel yang melebarkan
+    # semua baris ke baris terlebar (sel di kanan header jadi kolom "Unnamed: n").
+    # Chunk berikutnya mengikuti lebar ini supaya kolom setiap chunk sama.
+    width = max(len(r) for r in prefix + batch)
+    def rapikan(r):
+        return r[:width] + [""] * (width - len(r))
+    prefix = [rapikan(r) for r in prefix]
+
+    while True:
+        yield TextParser(prefix + [rapikan(r) for r in batch], header=h_row-1, skip_blank_lines=False).read()
+        batch = list(islice(rows, chunksize))
+        if not batch:
+            break
+
+
+def _chunk_csv(src, h_row, chunksize):
+    _rewind(src)
+    yield from pd.read_csv(src, header=h_row-1, chunksize=chunksize, skip_blank_lines=False)
+
+
+def _chunk_parquet(src, chunksize):
+    # Parquet sudah punya skema kolom sendiri, jadi baris header tidak dipakai
+    import pyarrow.parquet as pq
+    _rewind(src)
+    pf = pq.ParquetFile(src)
+    ada_data = False
+    for batch in pf.iter_batches(batch_size=chunksize):
+        ada_data = True
+        yield batch.to_pandas()
+    if not ada_data:
+        yield pf.schema_arrow.empty_table().to_pandas()
+
+
+def baca_tabel(src):
+    """Baca seluruh isi file (mis. hasil cleaning atau snapshot lot) sesuai formatnya."""
+    if src is None:
+        return None
+    _rewind(src)
+    jenis = jenis_file(src)
+    if jenis == 'csv':
+        return pd.read_csv(src)
+    if jenis == 'parquet':
+        return pd.read_parquet(src)
+    return pd.read_excel(src)
+
+
+def baca_chunk(src, h_row=1, chunksize=CHUNK_ROWS):
+    """Iterasi DataFrame per chunk dari file sumber; header diambil dari baris `h_row`."""
+    jenis = jenis_file(src)
+    if jenis == 'csv':
+        return _chunk_csv(src, h_row, chunksize)
+    if jenis == 'parquet':
+        return _chunk_parquet(src, chunksize)
+    return _chunk_excel(src, h_row, chunksize)
@@ -0,0 +1,101 @@
+"""Menjalankan proses panjang (FIFO + ekspor) di thread terpisah dari rerun Streamlit.
+
+Fungsi job menerima objek `Job` sebagai argumen pertama untuk melaporkan
+kemajuan (`job.lapor`) dan mengecek pembatalan. Objek Job disimpan di
+st.session_state oleh app.py; thread hanya menulis ke objek Job, tidak pernah
+memanggil fungsi `st.*`, sehingga aman walau script di-rerun berkali-kali.
+"""
+import datetime
+import threading
+import traceback
+import uuid
+
+ANTRI = 'antri'
+BERJALAN = 'berjalan'
+SELESAI = 'selesai'
+GAGAL = 'gagal'
+DIBATALKAN = 'dibatalkan'
+
+
+class Dibatalkan(Exception):
+    """Dilempar di dalam fungsi job saat pengguna menekan Batalkan."""
+
+
+class Job:
+    """Satu run di background: status, kemajuan (0..1), hasil atau error."""
+
+    def __init__(self, nama, fungsi, args=(), kwargs=None, info=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.nama = nama
+        # Data milik pemanggil (mis. log diagnostik) yang ikut disimpan bersama job
+        self.info = info or {}
+        self.status = ANTRI
+        self.progres = 0.0
+        self.pesan = "Menunggu..."
+        self.hasil = None
+        self.error = None
+        self.mulai = datetime.datetime.now()
+        self.selesai = None
+        self._fungsi = fungsi
+        self._args = args
+        self._kwargs = kwargs or {}
+        self._batal = threading.Event()
+        self._thread = threading.Thread(target=self._jalankan, name=f"job-{self.id}", daemon=True)
+
+    @property
+    def aktif(self):
+        return self.status in (ANTRI, BERJALAN)
+
+    def mulai_thread(self):
+        self._thread.start()
+        return self
+
+    def batalkan(self):
+        self._batal.set()
+
+    def cek_batal(self):
+        if self._batal.is_set():
+            raise Dibatalkan()
+
+    def lapor(self, pesan=None, progres=None):
+        """Perbarui status kemajuan; sekaligus titik pembatalan."""
+        if pesan is not None:
+            self.pesan = pesan
+        if progres is not None:
+            self.progres = min(max(float(progres), 0.0), 1.0)
+        self.cek_batal()
+
+    def durasi(self):
+        return ((self.selesai or datetime.datetime.now()) - self.mulai).total_seconds()
+
+    def _jalankan(self):
+        self.status = BERJALAN
+        try:
+            self.hasil = self._fungsi(self, *self._args, **self._kwargs)
+            self.status = SELESAI
+            self.progres = 1.0
+            self.pesan = "Selesai"
+        except Dibatalkan:
+            self.status = DIBATALKAN
+            self.pesan = "Dibatalkan"
+        except Exception as e:
+            self.status = GAGAL
+            self.error = e
+            self.pesan = f"Error: {e}"
+            traceback.print_exc()
+        finally:
+            self.selesai = datetime.datetime.now()
+
+
+def jalankan(jobs, nama, fungsi, *args, info=None, max_simpan=5, **kwargs):
+    """Buat & mulai Job baru, simpan di dict `jobs` (id -> Job), kembalikan Job-nya.
+
+    Hanya `max_simpan` job terakhir yang sudah tidak aktif dipertahankan supaya
+    hasil lama tidak menumpuk di memori sesi.
+    """
+    job = Job(nama, fungsi, args, kwargs, info)
+    jobs[job.id] = job
+    lama = [j for j in jobs.values() if not j.aktif]
+    for j in lama[:max(len(lama) - max_simpan, 0)]:
+        del jobs[j.id]
+    return job.mulai_thread()
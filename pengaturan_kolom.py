@@ -0,0 +1,67 @@
+"""Pengaturan Keep / Rename / Format kolom untuk tab "Data Cleaning" dalam satu tabel.
+
+Tabel dasar (satu baris per kolom file) dibuat sekali per file + daftar kolom
+dan ditampilkan dengan st.data_editor. Editor hanya mengembalikan perubahan
+(`edited_rows`: {baris: {kolom: nilai}}); `terapkan` membandingkannya dengan
+perubahan yang sudah diterapkan sebelumnya, sehingga setiap rerun hanya
+menghitung ulang baris yang berubah, berapa pun lebar sheet-nya.
+"""
+import pandas as pd
+
+from cleaning import FORMAT_KOLOM
+
+KOLOM_PENGATURAN = ['Kolom', 'Keep', 'Nama Baru', 'Format']
+
+
+class PengaturanKolom:
+    """Tabel pengaturan kolom beserta `selected_info` hasil editan terakhir."""
+
+    def __init__(self, kolom, resep=None):
+        # Kolom "Unnamed" (header kosong) tidak ditawarkan, sama seperti sebelumnya
+        self.kolom = [c for c in kolom if "Unnamed" not in str(c)]
+        kolom_resep = {str(i['old']): i for i in (resep or {}).get('selected_info', [])}
+        self.hilang = [c for c in kolom_resep if c not in set(map(str, self.kolom))] if resep else []
+
+        keep, nama, fmt = [], [], []
+        for col in self.kolom:
+            info = kolom_resep.get(str(col))
+            keep.append(info is not None if resep else True)
+            nama.append(info['new'] if info else str(col))
+            fmt.append(info['type'] if info else FORMAT_KOLOM[0])
+        self.dasar = pd.DataFrame({'Kolom': [str(c) for c in self.kolom], 'Keep': keep, 'Nama Baru': nama, 'Format': fmt})
+        self._nilai_dasar = list(zip(keep, nama, fmt))
+
+        self._baris = [self._info(i, {}) for i in range(len(self.kolom))]
+        self._terapan = {}
+        self._selected = None
+
+    def __len__(self):
+        return len(self.kolom)
+
+    def _info(self, i, edit):
+        # (keep, info selected_info) baris ke-i dari nilai dasar + editan baris itu
+        keep, nama, fmt = self._nilai_dasar[i]
+        keep = edit.get('Keep', keep)
+        nama = edit.get('Nama Baru', nama)
+        fmt = edit.get('Format', fmt)
+        # Sel yang dikosongkan di editor bernilai None: pakai nama asli / format default
+        return bool(keep), {'old': self.kolom[i], 'new': str(self.kolom[i]) if nama is None else nama,
+                            'type': fmt if fmt in FORMAT_KOLOM else FORMAT_KOLOM[0]}
+
+    def terapkan(self, edited_rows):
+        """Terapkan `edited_rows` st.data_editor; kembalikan nomor baris yang berubah sejak rerun lalu."""
+        edited_rows = {int(i): dict(v) for i, v in (edited_rows or {}).items()}
+        berubah = [i for i in set(edited_rows) | set(self._terapan)
+                   if edited_rows.get(i) != self._terapan.get(i)]
+        for i in berubah:
+            self._baris[i] = self._info(i, edited_rows.get(i, {}))
+        if berubah:
+            self._terapan = edited_rows
+            self._selected = None
+        return sorted(berubah)
+
+    def selected_info(self):
+        """Kolom yang dipertahankan: [{'old', 'new', 'type'}, ...] sesuai urutan file."""
+        if self._selected is None:
+            self._selected = [info for keep, info in self._baris if keep]
+        return self._selected
@@ -0,0 +1,195 @@
+"""Penyimpanan lokal hasil cleaning (SO / Masuk / Keluar) dalam file Parquet per periode.
+
+Struktur folder:
+
+    <root>/<jenis>/<periode>/v001.parquet, v002.parquet, ...
+
+Setiap simpan ulang periode yang sama menambah versi baru; pembacaan memakai
+versi terbaru kecuali diminta lain. Tab FIFO membaca hanya kolom yang di-mapping
+dan menyaring produk / tanggal langsung di pembaca Parquet (filter pushdown),
+sehingga data beberapa bulan tidak perlu dimuat utuh ke memori sesi.
+"""
+import datetime
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from export import tulis_parquet
+from tanggal import pastikan_tanggal
+
+JENIS_DATA = ["SO", "Masuk", "Keluar"]
+
+_POLA_PERIODE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+_POLA_VERSI = re.compile(r'^v(\d+)\.parquet$')
+
+
+def periode_default(tanggal=None):
+    """Periode bulanan 'YYYY-MM' (default: bulan berjalan)."""
+    return (tanggal or datetime.date.today()).strftime('%Y-%m')
+
+
+def _skalar(nilai, tipe):
+    # Nilai filter disesuaikan dengan tipe kolom Parquet (timestamp / date / teks / angka)
+    if pa.types.is_timestamp(tipe):
+        # Lewat datetime Python: resolusi Timestamp (mis. 's' dari objek date) bisa berbeda dengan kolom
+        return pa.scalar(pd.Timestamp(nilai).to_pydatetime(), type=tipe)
+    if pa.types.is_date(tipe):
+        return pa.scalar(pd.Timestamp(nilai).date(), type=tipe)
+    return pa.scalar(nilai).cast(tipe)
+
+
+def _kode_produk(kode, tipe):
+    # Kode yang tidak bisa di-cast ke tipe kolom (mis. "BRG-1" di kolom int64) pasti tidak ada di file: dilewati
+    hasil = []
+    for v in kode:
+        try:
+            hasil.append(_skalar(v, tipe).as_py())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, ValueError, TypeError):
+            continue
+    return pa.array(hasil, type=tipe)
+
+
+def _saring_tanggal(df, col, mulai, sampai):
+    # Kolom tanggal berupa teks / angka (mis. format "Text" di cleaning): perbandingan di Parquet akan
+    # membandingkan teks '15/04/2024' dengan '2024-03-31', jadi tanggal di-parse dulu seperti di FIFO
+    tgl = pastikan_tanggal(df[col])
+    keep = pd.Series(True, index=df.index)
+    if mulai is not None:
+        keep &= tgl >= pd.Timestamp(mulai).normalize()
+    if sampai is not None:
+        keep &= tgl < pd.Timestamp(sampai).normalize() + pd.Timedelta(days=1)
+    return df[keep.to_numpy()].reset_index(drop=True)
+
+
+class PenyimpananData:
+    """Dataset hasil cleaning per jenis & periode, dengan versi."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _folder(self, jenis, periode):
+        if jenis not in JENIS_DATA:
+            raise ValueError(f"Jenis data harus salah satu dari {JENIS_DATA}")
+        if not _POLA_PERIODE.match(str(periode)):
+            raise ValueError("Periode hanya boleh berisi huruf, angka, '-', '_' atau '.' (contoh: 2024-01)")
+        return os.path.join(self.root, jenis, str(periode))
+
+    def _versi(self, jenis, periode):
+        folder = self._folder(jenis, periode)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(int(m.group(1)) for m in map(_POLA_VERSI.match, os.listdir(folder)) if m)
+
+    def _path(self, jenis, periode, versi=None):
+        daftar = self._versi(jenis, periode)
+        if not daftar:
+            raise KeyError(f"Belum ada data {jenis} periode {periode}")
+        versi = daftar[-1] if versi is None else versi
+        if versi not in daftar:
+            raise KeyError(f"Versi {versi} data {jenis} periode {periode} tidak ada")
+        return os.path.join(self._folder(jenis, periode), f"v{versi:03d}.parquet")
+
+    def simpan(self, jenis, periode, df):
+        """Simpan `df` sebagai versi baru (jenis, periode); kembalikan nomor versinya."""
+        folder = self._folder(jenis, periode)
+        os.makedirs(folder, exist_ok=True)
+        versi = (self._versi(jenis, periode) or [0])[-1] + 1
+        path = os.path.join(folder, f"v{versi:03d}.parquet")
+        # Tulis ke file sementara dulu supaya pembaca lain tidak melihat file setengah jadi
+        tulis_parquet(df, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        return versi
+
+    def periode(self, jenis):
+        folder = os.path.join(self.root, jenis)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(p for p in os.listdir(folder) if self._versi(jenis, p))
+
+    def daftar(self):
+        """Katalog seluruh dataset: jenis, periode, versi, baris, kolom, waktu simpan."""
+        baris = []
+        for jenis in JENIS_DATA:
+            for periode in self.periode(jenis):
+                for versi in self._versi(jenis, periode):
+                    path = os.path.join(self._folder(jenis, periode), f"v{versi:03d}.parquet")
+                    meta = ds.dataset(path, format='parquet')
+                    baris.append({
+                        'Jenis': jenis, 'Periode': periode, 'Versi': versi,
+                        'Baris': meta.count_rows(), 'Kolom': len(meta.schema.names),
+                        'Disimpan': datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime('%d/%m/%Y %H:%M'),
+                    })
+        return pd.DataFrame(baris, columns=['Jenis', 'Periode', 'Versi', 'Baris', 'Kolom', 'Disimpan'])
+
+    def kolom(self, jenis, periode):
+        """Nama kolom (gabungan versi terbaru tiap periode) tanpa membaca isi data."""
+        hasil = []
+        for p in ([periode] if isinstance(periode, str) else periode):
+            for nama in ds.dataset(self._path(jenis, p), format='parquet').schema.names:
+                if nama not in hasil:
+                    hasil.append(nama)
+        return hasil
+
+    def baca(self, jenis, periode, kolom=None, produk=None, rentang=None, versi=None):
+        """Baca dataset satu / beberapa periode (urut sesuai `periode`) menjadi satu DataFrame.
+
+        `kolom`   = daftar kolom yang dibaca (None = semua).
+        `produk`  = (nama_kolom, daftar_kode): hanya baris produk tsb.
+        `rentang` = (nama_kolom, mulai, sampai): batas tanggal inklusif, None = tanpa batas.
+        `versi`   = nomor versi (hanya untuk satu periode); default versi terbaru.
+        Filter dijalankan oleh pembaca Parquet, baris lain tidak pernah dimuat; batas tanggal
+        untuk kolom tanggal berupa teks / angka diterapkan setelah kolom itu di-parse.
+        Kode produk yang tidak cocok dengan tipe kolom produk diabaikan.
+        """
+        potongan = []
+        for p in ([periode] if isinstance(periode, str) else periode):
+            data = ds.dataset(self._path(jenis, p, versi), format='parquet')
+            skema = data.schema
+            pilih = [c for c in kolom if c in skema.names] if kolom is not None else None
+
+            filter_ = None
+            def tambah(expr):
+                nonlocal filter_
+                filter_ = expr if filter_ is None else filter_ & expr
+            if produk is not None and produk[0] in skema.names:
+                tipe = skema.field(produk[0]).type
+                tambah(ds.field(produk[0]).isin(_kode_produk(produk[1], tipe)))
+            saring_nanti = None
+            if rentang is not None and rentang[0] in skema.names:
+                col, mulai, sampai = rentang
+                tipe = skema.field(col).type
+                if pa.types.is_timestamp(tipe) or pa.types.is_date(tipe):
+                    if mulai is not None:
+                        tambah(ds.field(col) >= _skalar(mulai, tipe))
+                    if sampai is not None:
+                        # Inklusif sampai akhir hari `sampai` untuk kolom Date Time
+                        batas = pd.Timestamp(sampai).normalize() + pd.Timedelta(days=1) if pa.types.is_timestamp(tipe) else sampai
+                        tambah(ds.field(col) < _skalar(batas, tipe) if pa.types.is_timestamp(tipe)
+                               else ds.field(col) <= _skalar(batas, tipe))
+                else:
+                    saring_nanti = rentang
+                    if pilih is not None and col not in pilih:
+                        pilih = pilih + [col]
+            df = data.to_table(columns=pilih, filter=filter_).to_pandas()
+            if saring_nanti is not None:
+                df = _saring_tanggal(df, *saring_nanti)
+                if kolom is not None and saring_nanti[0] not in kolom:
+                    df = df.drop(columns=saring_nanti[0])
+            potongan.append(df)
+        if not potongan:
+            return pd.DataFrame(columns=kolom or [])
+        return pd.concat(potongan, ignore_index=True)
+
+
+_penyimpanan = None
+
+
+def penyimpanan_global():
+    """Penyimpanan bersama di folder `FIFO_DATA_DIR` (default: ./fifo_data)."""
+    global _penyimpanan
+    if _penyimpanan is None:
+        _penyimpanan = PenyimpananData(os.environ.get('FIFO_DATA_DIR', 'fifo_data'))
+    return _penyimpanan
@@ -0,0 +1,122 @@
+"""Indeks posisi stok per tanggal (as-of) dari hasil FIFO.
+
+Dari ledger (`df_final` atau `LedgerRingkas.df`) disimpan per produk: tanggal
+terurut beserta Stok dan Nilai Stok kumulatifnya. Pertanyaan "berapa stok &
+nilai produk X pada tanggal D" dijawab dengan binary search di potongan array
+produk itu, tanpa memfilter ulang seluruh ledger.
+
+    indeks = IndeksStok.dari_ledger(df_final)
+    indeks.posisi('BRG-001', '2024-03-31')             # (stok, nilai)
+    indeks.matriks(tanggal=['2024-01-31', '2024-02-29'])  # produk x tanggal
+
+Indeks bisa disimpan ke Parquet (`simpan`) dan dimuat lagi (`muat`) tanpa ledger.
+"""
+import numpy as np
+import pandas as pd
+
+KOLOM_INDEKS = ['Produk', 'Tanggal', 'Stok', 'Nilai Stok']
+NILAI_MATRIKS = ['Nilai Stok', 'Stok']
+
+# Frekuensi tanggal untuk matriks bulk di UI (kode frekuensi pandas)
+FREKUENSI = {"Akhir Bulan": 'ME', "Akhir Minggu": 'W-SUN', "Harian": 'D'}
+
+
+def _ke_ns(tanggal):
+    return pd.to_datetime(tanggal).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def daftar_tanggal(mulai, sampai, frekuensi):
+    """Tanggal akhir periode antara `mulai` dan `sampai` (mis. tiap akhir bulan)."""
+    return list(pd.date_range(mulai, sampai, freq=FREKUENSI.get(frekuensi, frekuensi)))
+
+
+class IndeksStok:
+    """Tanggal, Stok dan Nilai Stok per produk dalam array bersambung.
+
+    Baris produk ke-i ada di `[awal[i], awal[i+1])`, terurut menurut tanggal.
+    Baris ledger tanpa tanggal (NaT) tidak bisa ditempatkan di waktu dan dilewati.
+    """
+
+    def __init__(self, produk, awal, tanggal, stok, nilai):
+        self.produk = pd.Index(produk)
+        self._awal = awal
+        self._tanggal = tanggal
+        self._stok = stok
+        self._nilai = nilai
+        self._posisi_produk = {p: i for i, p in enumerate(self.produk)}
+
+    @classmethod
+    def dari_ledger(cls, df_final):
+        """Bangun indeks dari ledger yang sudah punya kolom Stok & Nilai Stok."""
+        df = df_final[KOLOM_INDEKS]
+        tanggal = pd.to_datetime(df['Tanggal'])
+        ada = tanggal.notna().to_numpy() & df['Produk'].notna().to_numpy()
+
+        kode, produk = pd.factorize(df['Produk'].to_numpy(dtype=object)[ada], sort=False)
+        tgl = _ke_ns(tanggal[ada])
+        # Stable: baris di tanggal yang sama tetap dalam urutan ledger (urutan Stok kumulatif)
+        urut = np.lexsort((tgl, kode))
+        kode = kode[urut]
+        awal = np.searchsorted(kode, np.arange(len(produk) + 1), side='left')
+        return cls(produk, awal, tgl[urut],
+                   df['Stok'].to_numpy(dtype=float)[ada][urut],
+                   df['Nilai Stok'].to_numpy(dtype=float)[ada][urut])
+
+    def __len__(self):
+        return len(self.produk)
+
+    @staticmethod
+    def _batas(tanggal, akhir_hari):
+        # (batas ns, side searchsorted): akhir hari = semua transaksi sebelum hari berikutnya
+        tanggal = pd.DatetimeIndex(pd.to_datetime(list(tanggal)))
+        if akhir_hari:
+            return _ke_ns(tanggal.normalize() + pd.Timedelta(days=1)), 'left'
+        return _ke_ns(tanggal), 'right'
+
+    def _nilai_asof(self, i, batas, side):
+        a, b = self._awal[i], self._awal[i + 1]
+        n = np.searchsorted(self._tanggal[a:b], batas, side=side)
+        pos = a + np.maximum(n - 1, 0)
+        ada = n > 0
+        return np.where(ada, self._stok[pos], 0.0), np.where(ada, self._nilai[pos], 0.0)
+
+    def posisi(self, produk, tanggal, akhir_hari=True):
+        """(Stok, Nilai Stok) `produk` pada `tanggal`.
+
+        Dengan `akhir_hari=True` semua transaksi di hari itu ikut dihitung;
+        selain itu hanya transaksi sampai jam `tanggal` tsb. Sebelum transaksi
+        pertama produk posisinya (0, 0). KeyError jika produk tidak ada di ledger.
+        """
+        stok, nilai = self._nilai_asof(self._posisi_produk[produk], *self._batas([tanggal], akhir_hari))
+        return float(stok[0]), float(nilai[0])
+
+    def matriks(self, tanggal, produk=None, nilai='Nilai Stok', akhir_hari=True):
+        """DataFrame produk x tanggal berisi `nilai` ('Nilai Stok' atau 'Stok') per tanggal.
+
+        `produk` None = semua produk di indeks.
+        """
+        tanggal = pd.DatetimeIndex(pd.to_datetime(list(tanggal)))
+        batas, side = self._batas(tanggal, akhir_hari)
+        produk = list(self.produk) if produk is None else list(produk)
+        hasil = np.zeros((len(produk), len(tanggal)))
+        for r, p in enumerate(produk):
+            stok, nilai_stok = self._nilai_asof(self._posisi_produk[p], batas, side)
+            hasil[r] = stok if nilai == 'Stok' else nilai_stok
+        return pd.DataFrame(hasil, index=pd.Index(produk, name='Produk'), columns=tanggal)
+
+    def ke_frame(self):
+        """Isi indeks sebagai DataFrame (Produk, Tanggal, Stok, Nilai Stok)."""
+        return pd.DataFrame({
+            'Produk': self.produk.to_numpy()[np.repeat(np.arange(len(self.produk)), np.diff(self._awal))],
+            'Tanggal': self._tanggal.view('datetime64[ns]'),
+            'Stok': self._stok,
+            'Nilai Stok': self._nilai,
+        })
+
+    def simpan(self, target):
+        """Tulis indeks ke Parquet (path atau buffer)."""
+        self.ke_frame().to_parquet(target, index=False)
+
+    @classmethod
+    def muat(cls, src):
+        return cls.dari_ledger(pd.read_parquet(src))
@@ -0,0 +1,81 @@
+"""Resep cleaning: pengaturan tab "Data Cleaning" yang disimpan ke file JSON.
+
+Resep berisi baris header, baris awal data, kata filter, TRIM dan `selected_info`
+(kolom yang dipertahankan beserta nama baru & formatnya). Resep yang sama bisa
+dimuat lagi di UI atau dipakai `cleaning_cli.py` untuk membersihkan satu folder
+workbook sekaligus.
+
+    {
+      "h_row": 1, "d_start": 2, "f_word": "TOTAL", "do_trim": true,
+      "selected_info": [{"old": "Kode Barang", "new": "Kode", "type": "Text"}, ...]
+    }
+"""
+import json
+
+from cleaning import FORMAT_KOLOM, bersihkan_file
+
+VERSI_RESEP = 1
+
+
+def buat_resep(h_row, d_start, f_word, do_trim, selected_info):
+    return {
+        'versi': VERSI_RESEP,
+        'h_row': int(h_row),
+        'd_start': int(d_start),
+        'f_word': f_word or "",
+        'do_trim': bool(do_trim),
+        'selected_info': [{'old': i['old'], 'new': i['new'], 'type': i['type']} for i in selected_info],
+    }
+
+
+def validasi_resep(resep):
+    """Kembalikan daftar pesan kesalahan isi resep (kosong = valid)."""
+    errors = []
+    for kunci in ('h_row', 'selected_info'):
+        if kunci not in resep:
+            errors.append(f"Resep tidak punya '{kunci}'")
+    if errors:
+        return errors
+    if int(resep['h_row']) < 1 or int(resep.get('d_start') or resep['h_row'] + 1) <= int(resep['h_row']):
+        errors.append("Baris data harus setelah baris header")
+    if not resep['selected_info']:
+        errors.append("Resep tidak punya kolom yang dipertahankan")
+    for i in resep['selected_info']:
+        if not {'old', 'new', 'type'} <= set(i):
+            errors.append(f"Pengaturan kolom tidak lengkap: {i}")
+        elif i['type'] not in FORMAT_KOLOM:
+            errors.append(f"Format '{i['type']}' kolom {i['old']} tidak dikenal")
+    return errors
+
+
+def resep_ke_json(resep):
+    return json.dumps(resep, ensure_ascii=False, indent=2, default=str)
+
+
+def baca_resep(src):
+    """Baca resep dari path, file object / UploadedFile, atau teks JSON."""
+    if hasattr(src, 'read'):
+        isi = src.read()
+        if hasattr(src, 'seek'):
+            src.seek(0)
+        resep = json.loads(isi)
+    elif isinstance(src, str) and src.lstrip().startswith('{'):
+        resep = json.loads(src)
+    else:
+        with open(src, encoding='utf-8') as f:
+            resep = json.load(f)
+    errors = validasi_resep(resep)
+    if errors:
+        raise ValueError("; ".join(errors))
+    return resep
+
+
+def simpan_resep(resep, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(resep_ke_json(resep))
+
+
+def terapkan_resep(src, resep, log=None):
+    """Bersihkan file `src` (path / buffer) memakai resep; sama dengan tombol Simpan Cleaning."""
+    return bersihkan_file(src, resep['h_row'], resep.get('d_start'), resep.get('f_word', ""),
+                          resep['selected_info'], resep.get('do_trim', True), log=log)
@@ -0,0 +1,107 @@
+"""Format tampilan tabel untuk st.dataframe (angka & tanggal gaya laporan).
+
+Ledger FIFO tetap disimpan numerik; hanya halaman yang sedang dilihat yang
+diubah ke teks, sehingga hasil jutaan baris tidak digandakan di memori dan
+tidak seluruhnya dikirim ke browser.
+"""
+import datetime
+import math
+
+import numpy as np
+import pandas as pd
+
+UKURAN_HALAMAN = [50, 100, 500, 1000]
+
+
+def _kolom_mengandung(df, kata):
+    return [col for col in df.columns if any(x in str(col) for x in kata)]
+
+
+def _format_rupiah(series):
+    return pd.to_numeric(series, errors='coerce').apply(lambda x: f"Rp {x:,.2f}" if pd.notna(x) and x != 0 else ("Rp 0.00" if x == 0 else ""))
+
+
+def _format_bulat(series):
+    return pd.to_numeric(series, errors='coerce').apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
+
+
+def format_tampilan_cleaning(df_clean):
+    """Format hasil cleaning untuk preview (kolom Harga/Total/Nilai, Tanggal/Date, Qty/Stok)."""
+    df_display_clean = df_clean.copy()
+    # Format currency
+    for col in _kolom_mengandung(df_display_clean, ['Harga', 'Total', 'Nilai']):
+        df_display_clean[col] = _format_rupiah(df_display_clean[col])
+    # Format date
+    for col in _kolom_mengandung(df_display_clean, ['Tanggal', 'Date']):
+        if pd.api.types.is_datetime64_any_dtype(df_display_clean[col]):
+            df_display_clean[col] = df_display_clean[col].dt.strftime('%d/%m/%Y')
+        elif df_display_clean[col].map(lambda x: isinstance(x, datetime.date)).any():
+            # Kolom format "Date" berisi objek date (bukan datetime64)
+            df_display_clean[col] = df_display_clean[col].map(lambda x: x.strftime('%d/%m/%Y') if isinstance(x, datetime.date) else x)
+    # Format integers
+    for col in _kolom_mengandung(df_display_clean, ['Qty', 'Stok']):
+        df_display_clean[col] = _format_bulat(df_display_clean[col])
+    return df_display_clean
+
+
+def format_tampilan_fifo(df_final):
+    """Format ledger FIFO untuk ditampilkan (Rupiah, tanggal dd/mm/yyyy hh:mm:ss, qty bulat)."""
+    df_display = df_final.copy()
+    # Format currency
+    for col in _kolom_mengandung(df_display, ['Harga', 'Total', 'Nilai']):
+        df_display[col] = _format_rupiah(df_display[col])
+    # Format date
+    if 'Tanggal' in df_display.columns:
+        df_display['Tanggal'] = df_display['Tanggal'].dt.strftime('%d/%m/%Y %H:%M:%S')
+    # Format integers
+    for col in _kolom_mengandung(df_display, ['Qty', 'Stok']):
+        df_display[col] = _format_bulat(df_display[col])
+    return df_display
+
+
+def format_tampilan_matriks(matriks, nilai):
+    """Format matriks produk x tanggal (IndeksStok.matriks): header dd/mm/yyyy, angka Rupiah / bulat."""
+    df_display = matriks.copy()
+    df_display.columns = [pd.Timestamp(c).strftime('%d/%m/%Y') for c in df_display.columns]
+    fmt = _format_bulat if nilai == 'Stok' else _format_rupiah
+    for col in df_display.columns:
+        df_display[col] = fmt(df_display[col])
+    return df_display.reset_index()
+
+
+def filter_ledger(df_final, produk=None, keterangan=None):
+    """Baris ledger untuk produk/keterangan terpilih (list kosong/None = semua), tetap numerik.
+
+    Bisa dipakai untuk ledger lengkap maupun `LedgerRingkas.df`.
+    """
+    mask = np.ones(len(df_final), dtype=bool)
+    if produk:
+        mask &= df_final['Produk'].isin(produk).to_numpy()
+    if keterangan:
+        mask &= df_final['Keterangan'].isin(keterangan).to_numpy()
+    return df_final if mask.all() else df_final[mask]
+
+
+def jumlah_halaman(n_baris, ukuran):
+    return max(math.ceil(n_baris / ukuran), 1)
+
+
+def ambil_halaman(df, nomor, ukuran):
+    """Potongan baris untuk halaman ke-`nomor` (mulai 1)."""
+    awal = (nomor - 1) * ukuran
+    return df.iloc[awal:awal + ukuran]
+
+
+def ringkasan_produk(df_final):
+    """Satu baris per produk: total masuk/keluar, Stok & Nilai Stok akhir dan status akhir."""
+    grp = df_final.groupby('Produk', sort=False, observed=True)
+    akhir = grp.tail(1).set_index('Produk')
+    ringkas = pd.DataFrame({
+        'Transaksi': grp.size(),
+        'Qty Masuk': grp['Qty Masuk'].sum(),
+        'Qty Keluar': grp['Qty Keluar'].sum(),
+        'Stok Akhir': akhir['Stok'],
+        'Nilai Stok Akhir': akhir['Nilai Stok'],
+        'Keterangan': akhir['Keterangan'],
+    })
+    return ringkas.rename_axis('Produk').reset_index()
@@ -0,0 +1,238 @@
+"""Parsing kolom tanggal yang dipakai bersama oleh cleaning dan FIFO.
+
+Berbeda dengan `pd.to_datetime(errors='coerce')` biasa:
+- format teks dideteksi sekali per kolom dari contoh nilai unik, dengan
+  urutan hari-bulan-tahun (gaya Indonesia, mis. 05/03/2024 = 5 Maret 2024)
+  dan nama bulan Indonesia / Inggris (5 Maret 2024, 05-Agu-2024);
+- angka (atau teks angka) dibaca sebagai nomor seri tanggal Excel; angka bulat
+  di atas rentang seri (mis. 20240131) dibaca seperti teks tanggal;
+- hanya nilai unik yang di-parse, lalu dipetakan balik ke semua baris.
+
+Kolom hasil format "Date Time" bertipe datetime64, dan itulah penanda "sudah
+bertipe tanggal": `pastikan_tanggal` di FIFO langsung memakai kolom seperti itu.
+Kolom format "Date" berisi objek datetime.date (agar file hasil tetap tanpa jam);
+di FIFO kolom itu dikonversi langsung dengan `pd.to_datetime`, tanpa deteksi
+format maupun factorize.
+"""
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+
+# Urutan = prioritas jika beberapa format sama-sama cocok dengan contoh nilai
+FORMAT_TANGGAL = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S',
+    '%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M',
+    '%d-%m-%Y', '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M', '%d.%m.%Y',
+    '%d %b %Y', '%d %b %Y %H:%M:%S', '%d %b %Y %H:%M', '%d-%b-%Y', '%d-%b-%y',
+    '%d/%m/%y', '%d-%m-%y', '%Y/%m/%d', '%Y%m%d',
+    # Bulan-hari (gaya AS) hanya menang jika lebih banyak cocok, mis. ada tanggal 13..31 di posisi kedua
+    '%m/%d/%Y', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M',
+]
+
+# Nama bulan Indonesia / Inggris (lengkap & singkatan) -> singkatan Inggris untuk format %b
+BULAN = {
+    'januari': 'Jan', 'january': 'Jan', 'jan': 'Jan',
+    'februari': 'Feb', 'pebruari': 'Feb', 'february': 'Feb', 'feb': 'Feb',
+    'maret': 'Mar', 'march': 'Mar', 'mar': 'Mar',
+    'april': 'Apr', 'apr': 'Apr',
+    'mei': 'May', 'may': 'May',
+    'juni': 'Jun', 'june': 'Jun', 'jun': 'Jun',
+    'juli': 'Jul', 'july': 'Jul', 'jul': 'Jul',
+    'agustus': 'Aug', 'august': 'Aug', 'agu': 'Aug', 'agt': 'Aug', 'ags': 'Aug', 'aug': 'Aug',
+    'september': 'Sep', 'sept': 'Sep', 'sep': 'Sep',
+    'oktober': 'Oct', 'october': 'Oct', 'okt': 'Oct', 'oct': 'Oct',
+    'november': 'Nov', 'nopember': 'Nov', 'nov': 'Nov',
+    'desember': 'Dec', 'december': 'Dec', 'des': 'Dec', 'dec': 'Dec',
+}
+_POLA_BULAN = re.compile(r'\b(' + '|'.join(sorted(BULAN, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+# Nama hari di depan tanggal ('Senin, 5 Februari 2024') dibuang
+_POLA_HARI = re.compile(r"^(senin|selasa|rabu|kamis|jum'?at|sabtu|minggu|ahad),?\s*", re.IGNORECASE)
+_POLA_ANGKA = r'\d+(?:\.\d+)?'
+
+# Nomor seri Excel: 1 = 1900-01-01 (asal 1899-12-30 mengikuti bug tahun kabisat 1900 Excel) s/d 9999-12-31
+ASAL_SERIAL = pd.Timestamp('1899-12-30')
+MAX_SERIAL = 2958465
+
+N_CONTOH = 200
+_NAT = np.datetime64('NaT', 'us')
+
+
+def _kosong(series):
+    return series.isna() | (series.astype(str).str.strip() == "")
+
+
+def sudah_tanggal(series):
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+
+def _dari_serial(nilai):
+    nilai = np.asarray(nilai, dtype=float)
+    ok = (nilai >= 1) & (nilai <= MAX_SERIAL)
+    hasil = np.full(len(nilai), _NAT)
+    if ok.any():
+        # Jam di seri Excel presisi milidetik; pembulatan menghapus sisa float (05:37:34.999999 -> 05:37:35)
+        hasil[ok] = (ASAL_SERIAL + pd.to_timedelta(nilai[ok], unit='D').round('ms')).to_numpy(dtype='datetime64[us]')
+    return hasil
+
+
+def _normalisasi_teks(teks):
+    # '5 Maret 2024' -> '5 Mar 2024', '05-Agu-2024' -> '05-Aug-2024'
+    teks = teks.str.strip()
+    ada_huruf = teks.str.contains('[A-Za-z]', regex=True, na=False)
+    if ada_huruf.any():
+        diganti = teks[ada_huruf].str.replace(_POLA_HARI, "", regex=True)
+        teks = teks.where(~ada_huruf, diganti.str.replace(_POLA_BULAN, lambda m: BULAN[m.group(1).lower()], regex=True))
+    return teks
+
+
+def deteksi_format(teks):
+    """Format di FORMAT_TANGGAL yang paling banyak cocok dengan contoh teks (None jika tidak ada)."""
+    contoh = pd.Series(teks[:N_CONTOH], dtype=object)
+    terbaik, jumlah = None, 0
+    for fmt in FORMAT_TANGGAL:
+        n = pd.to_datetime(contoh, format=fmt, errors='coerce').notna().sum()
+        if n > jumlah:
+            terbaik, jumlah = fmt, n
+            if n == len(contoh):
+                break
+    return terbaik
+
+
+class ParserTanggal:
+    """Parser untuk satu kolom; format teks dideteksi sekali lalu dipakai untuk semua chunk.
+
+    Satu objek dipakai untuk semua chunk kolom yang sama (lihat `bersihkan_file`),
+    sehingga chunk berikutnya langsung memakai format kolom tanpa deteksi ulang.
+    """
+
+    def __init__(self):
+        self.format = None
+
+    def _deteksi(self, teks):
+        contoh = _normalisasi_teks(teks.iloc[:N_CONTOH * 5])
+        contoh = contoh[(contoh != "") & ~contoh.str.fullmatch(_POLA_ANGKA).fillna(False)]
+        self.format = deteksi_format(contoh.to_numpy())
+
+    def _parse_teks(self, teks):
+        teks = pd.Series(teks, dtype=object)
+        if self.format is None:
+            self._deteksi(teks)
+        # Jalur cepat: semua nilai langsung dengan format kolom; hanya yang gagal dibersihkan & dicoba ulang
+        if self.format is not None:
+            hasil = pd.to_datetime(teks, format=self.format, errors='coerce').to_numpy(dtype='datetime64[us]', copy=True)
+        else:
+            hasil = np.full(len(teks), _NAT)
+        gagal = np.isnat(hasil)
+        if not gagal.any():
+            return hasil
+
+        bersih = _normalisasi_teks(teks[gagal])
+        parsed = np.full(len(bersih), _NAT)
+        angka = bersih.str.fullmatch(_POLA_ANGKA).fillna(False).to_numpy(dtype=bool, copy=True)
+        if angka.any():
+            parsed[angka] = _dari_serial(bersih[angka].astype(float).to_numpy())
+            # Angka di luar rentang seri Excel dicoba sebagai format teks (mis. 20240131)
+            angka &= ~np.isnat(parsed)
+        sisa = ~angka & (bersih != "").to_numpy()
+        if sisa.any() and self.format is not None:
+            parsed[sisa] = pd.to_datetime(bersih[sisa], format=self.format, errors='coerce').to_numpy(dtype='datetime64[us]')
+        sisa &= np.isnat(parsed)
+        if sisa.any():
+            # Nilai yang tidak cocok format kolom: ISO 8601, lalu tebak per nilai (tetap hari lebih dulu;
+            # dayfirst tidak boleh dipakai untuk ISO karena 2024-01-06 akan terbaca 1 Juni)
+            parsed[sisa] = pd.to_datetime(bersih[sisa], format='ISO8601', errors='coerce').to_numpy(dtype='datetime64[us]')
+            sisa &= np.isnat(parsed)
+        if sisa.any():
+            parsed[sisa] = pd.to_datetime(bersih[sisa], errors='coerce', dayfirst=True,
+                                          format='mixed').to_numpy(dtype='datetime64[us]')
+        hasil[gagal] = parsed
+        return hasil
+
+    def _dari_angka(self, angka):
+        # Nomor seri Excel; bilangan bulat di atas rentang seri (mis. 20240131) dibaca sebagai teks,
+        # sama seperti teks angka di `_parse_teks`
+        hasil = _dari_serial(angka)
+        besar = np.isnat(hasil) & (angka > MAX_SERIAL) & np.isfinite(angka)
+        besar[besar] = angka[besar] == np.floor(angka[besar])
+        if besar.any():
+            hasil[besar] = self._parse_teks(np.array([str(int(v)) for v in angka[besar]], dtype=object))
+        return hasil
+
+    def _parse_unik(self, unik):
+        jenis = pd.api.types.infer_dtype(unik, skipna=True)
+        if jenis == 'string':
+            return self._parse_teks(unik)
+        if jenis in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+            return self._dari_angka(np.asarray(unik, dtype=float))
+        if jenis == 'boolean':
+            # True/False bukan nomor seri (True akan terbaca 1899-12-31)
+            return np.full(len(unik), _NAT)
+        if jenis in ('datetime', 'datetime64', 'date'):
+            return pd.to_datetime(pd.Series(unik, dtype=object), errors='coerce').to_numpy(dtype='datetime64[us]')
+
+        # Campuran (mis. seri tanggal Excel + baris teks TOTAL di kolom yang sama).
+        # Angka (termasuk teks angka) di rentang seri Excel dikonversi sekaligus; sisanya dipisah per jenis nilai.
+        hasil = np.full(len(unik), _NAT)
+        angka = pd.to_numeric(pd.Series(unik, dtype=object), errors='coerce').to_numpy(dtype=float)
+        boolean = np.array([isinstance(v, (bool, np.bool_)) for v in unik], dtype=bool)
+        teks = np.array([isinstance(v, str) for v in unik], dtype=bool)
+        serial = (angka >= 1) & (angka <= MAX_SERIAL) & ~boolean
+        if serial.any():
+            hasil[serial] = _dari_serial(angka[serial])
+        besar = (angka > MAX_SERIAL) & ~boolean & ~teks
+        if besar.any():
+            hasil[besar] = self._dari_angka(angka[besar])
+        sisa = np.flatnonzero(~serial & ~besar)
+        if len(sisa):
+            nilai = unik[sisa]
+            teks = teks[sisa]
+            waktu = np.array([isinstance(v, (datetime.date, np.datetime64)) for v in nilai], dtype=bool)
+            if teks.any():
+                hasil[sisa[teks]] = self._parse_teks(nilai[teks])
+            if waktu.any():
+                hasil[sisa[waktu]] = pd.to_datetime(pd.Series(nilai[waktu], dtype=object),
+                                                    errors='coerce').to_numpy(dtype='datetime64[us]')
+        return hasil
+
+    def parse(self, series, hanya_tanggal=False):
+        """Series datetime64 (NaT jika tidak dikenali); `hanya_tanggal` = objek datetime.date seperti `.dt.date`."""
+        if sudah_tanggal(series):
+            return series.dt.date if hanya_tanggal else series
+        jenis = pd.api.types.infer_dtype(series, skipna=True)
+        if jenis in ('date', 'datetime'):
+            # Objek date / datetime (mis. hasil format "Date"): konversi langsung lebih cepat daripada factorize
+            hasil = pd.Series(pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[us]'),
+                              index=series.index, name=series.name)
+            return hasil.dt.date if hanya_tanggal else hasil
+        kode, unik = pd.factorize(series, use_na_sentinel=True)
+        unik = np.asarray(unik, dtype=object)
+        nilai = self._parse_unik(unik) if len(unik) else np.array([], dtype='datetime64[us]')
+        hasil = pd.Series(np.where(kode >= 0, nilai[kode] if len(nilai) else _NAT, _NAT),
+                          index=series.index, name=series.name)
+        # Kosong = NaT, sama dengan `.dt.date`
+        return hasil.dt.date if hanya_tanggal else hasil
+
+
+def parse_tanggal(series, parser=None, hanya_tanggal=False):
+    """Parse satu kolom tanggal; `parser` = ParserTanggal kolom itu jika dipakai lintas chunk."""
+    return (parser or ParserTanggal()).parse(series, hanya_tanggal)
+
+
+def pastikan_tanggal(series):
+    """Kolom tanggal untuk FIFO: kolom datetime64 dipakai apa adanya, selain itu di-parse.
+
+    Seperti `pd.to_datetime` tanpa `errors='coerce'`, nilai yang tidak bisa
+    dibaca sebagai tanggal menimbulkan ValueError.
+    """
+    if sudah_tanggal(series):
+        return series
+    hasil = parse_tanggal(series)
+    gagal = hasil.isna()
+    if gagal.any():
+        gagal &= ~_kosong(series)
+    if gagal.any():
+        contoh = series[gagal].iloc[0]
+        raise ValueError(f"Nilai '{contoh}' di kolom {series.name} bukan tanggal")
+    return hasil
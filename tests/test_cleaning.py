@@ -0,0 +1,78 @@
+"""Hasil versi vektor di cleaning.py harus sama dengan implementasi lama per sel / per baris."""
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning import clean_numeric_series, clean_numeric_strict, hapus_baris_kata, trim_teks
+
+NILAI_CAMPURAN = [
+    "Rp 1.234.567,89", "Rp1.000", " Rp 2.500,- ", "Rp 0", "1,5", "1.5", "12,345.67", "1.2.3", "-5", "-1.250,75",
+    "  12  ", "", ".", "abc", "TOTAL", None, np.nan, pd.NA, 7, 0, -3, 7.25, -3.5, 1e20, 1e-5,
+    datetime.datetime(2024, 1, 2, 10, 30), datetime.date(2024, 3, 5), pd.Timestamp('2023-12-31'), True, False,
+]
+
+
+def _acak(n, seed=0):
+    r = random.Random(seed)
+    return [r.choice(NILAI_CAMPURAN) for _ in range(n)]
+
+
+def _filter_lama(df, f_word):
+    mask = df.apply(lambda r: r.astype(str).str.contains(f_word, case=False).any(), axis=1)
+    return df[~mask].reset_index(drop=True)
+
+
+def _trim_lama(df):
+    return df.map(lambda x: x.strip() if isinstance(x, str) else x)
+
+
+@pytest.fixture
+def df_campuran():
+    r = random.Random(1)
+    n = 2000
+    return pd.DataFrame({
+        'campur': pd.Series(_acak(n), dtype=object),
+        'teks': [r.choice([' x ', 'y', None, 3, '  Total ', 'Rp 1.000']) for _ in range(n)],
+        'int': range(n),
+        'float': np.arange(n) / 4,
+        'tanggal': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'str': pd.Series([r.choice([' p ', 'q  ', None]) for _ in range(n)], dtype='str'),
+    })
+
+
+def test_clean_numeric_series_sama_dengan_per_sel():
+    s = pd.Series(_acak(5000), dtype=object)
+    pd.testing.assert_series_equal(clean_numeric_series(s), s.apply(clean_numeric_strict).astype(float))
+
+
+@pytest.mark.parametrize('dtype', ['int64', 'float64', 'str', 'object'])
+def test_clean_numeric_series_per_dtype(dtype):
+    r = random.Random(2)
+    s = pd.Series([r.randint(-100_000, 100_000) for _ in range(500)])
+    s = (s / 7).astype(dtype) if dtype in ('float64', 'object') else s.astype(dtype)
+    pd.testing.assert_series_equal(clean_numeric_series(s), s.apply(clean_numeric_strict).astype(float))
+
+
+def test_clean_numeric_series_kosong():
+    s = pd.Series([], dtype=object)
+    pd.testing.assert_series_equal(clean_numeric_series(s), s.apply(clean_numeric_strict).astype(float),
+                                   check_index_type=False)
+
+
+def test_trim_teks_sama_dengan_map_strip(df_campuran):
+    pd.testing.assert_frame_equal(trim_teks(df_campuran), _trim_lama(df_campuran))
+
+
+@pytest.mark.parametrize('f_word', ['total', 'rp 1', '2024-01-0', r'\d\.5', 'none', 'nan', 'true', '0.5', '-5'])
+def test_hapus_baris_kata_sama_dengan_apply(df_campuran, f_word):
+    pd.testing.assert_frame_equal(hapus_baris_kata(df_campuran, f_word), _filter_lama(df_campuran, f_word))
+
+
+@pytest.mark.parametrize('f_word', ['5.0', '2.25', '7'])
+def test_hapus_baris_kata_kolom_angka(f_word):
+    # int + float dalam satu baris: apply(axis=1) melihat int sebagai float ("5.0")
+    df = pd.DataFrame({'i': range(100), 'f': np.arange(100) / 4})
+    pd.testing.assert_frame_equal(hapus_baris_kata(df, f_word), _filter_lama(df, f_word))
@@ -0,0 +1,45 @@
+"""XlsxWriter dan openpyxl harus menghasilkan sel Excel yang sama (nilai, tipe & number format)."""
+import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import export
+
+
+def _sel(buffer):
+    ws = load_workbook(buffer).active
+    return [[(c.value, c.data_type, c.number_format) for c in baris] for baris in ws.iter_rows()]
+
+
+@pytest.fixture
+def df_campuran():
+    return pd.DataFrame({
+        'Tanggal': pd.to_datetime(['2025-01-01 10:00', None, '2025-02-03 00:00']),
+        'Tgl Date': [datetime.date(2025, 1, 1), None, datetime.date(2025, 3, 4)],
+        'Tgl Opsional': [datetime.date(2025, 1, 2), datetime.date(2025, 1, 5), None],
+        'Campur': [datetime.datetime(2025, 1, 3, 5), 'teks', 7],
+        'Qty': [1, 2, 3],
+        'Harga': [1500.5, None, 2.25],
+        'Kode': ['A', None, 'C'],
+    })
+
+
+@pytest.mark.skipif(not export._ADA_XLSXWRITER, reason="XlsxWriter tidak terpasang")
+@pytest.mark.parametrize('formats', [
+    [None] * 7,
+    ['dd/mm/yyyy hh:mm:ss', 'dd/mm/yyyy', None, None, '#,##0', '"Rp" #,##0.00', None],
+])
+def test_xlsxwriter_sama_dengan_openpyxl(df_campuran, formats, monkeypatch):
+    a = _sel(export.tulis_excel(df_campuran, formats, 'S'))
+    monkeypatch.setattr(export, '_ADA_XLSXWRITER', False)
+    b = _sel(export.tulis_excel(df_campuran, formats, 'S'))
+    assert a == b
+
+
+@pytest.mark.skipif(not export._ADA_XLSXWRITER, reason="XlsxWriter tidak terpasang")
+def test_kolom_tanggal_tanpa_format_tetap_tanggal(df_campuran):
+    hasil = pd.read_excel(export.tulis_excel(df_campuran, [None] * 7, 'S'))
+    for col in ['Tanggal', 'Tgl Date', 'Tgl Opsional']:
+        assert pd.api.types.is_datetime64_any_dtype(hasil[col]), col
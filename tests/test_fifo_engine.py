@@ -0,0 +1,277 @@
+"""Ledger fifo_engine harus sama dengan loop FIFO lama per produk di app.py (baris, Stok/Nilai Stok, Keterangan)."""
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import tulis_parquet
+from fifo_engine import KOLOM_REF, run_fifo, run_fifo_lengkap, run_fifo_ringkas
+
+MAPPING = {'p_so': 'Kode', 'q_so': 'Qty', 'h_so': 'Harga', 't_in': 'Tgl', 'p_in': 'Kode', 'q_in': 'Qty',
+           'h_in': 'Harga', 't_out': 'Tanggal', 'p_out': 'Barang', 'q_out': 'Jml'}
+# Label 'Info' dipakai dua kali: posisi kolom dari config pertama, nilai dari config terakhir
+OPT_CONFIGS = [{'label': 'Info', 'so': 'Lok', 'in': 'Sup', 'out': 'Cust'},
+               {'label': 'Sup', 'so': '-', 'in': 'Sup', 'out': '-'},
+               {'label': 'Info', 'so': '-', 'in': 'Sup', 'out': 'Cust'}]
+
+
+def run_fifo_lama(df_so_raw, df_in_raw, df_out_raw, m, opt_configs):
+    """Salinan loop FIFO lama (app.py sebelum fifo_engine), tanpa bagian Streamlit.
+
+    Satu-satunya perubahan: Keluar diurutkan stable. Loop lama memakai quicksort,
+    sehingga urutan transaksi Keluar di tanggal yang sama (dan lot yang terpakai) tidak tentu.
+    """
+    if df_in_raw is not None:
+        d_in = df_in_raw.copy()
+        d_in['TGL_FIFO'] = pd.to_datetime(d_in[m['t_in']])
+        d_in['QTY_FIFO'] = pd.to_numeric(d_in[m['q_in']]).fillna(0)
+        d_in['PRC_FIFO'] = pd.to_numeric(d_in[m['h_in']]).fillna(0)
+        d_in['SOURCE'] = 1
+    else: d_in = pd.DataFrame()
+
+    if df_so_raw is not None:
+        d_so = df_so_raw.copy()
+        ref_y = d_in['TGL_FIFO'].dt.year.min() if not d_in.empty else pd.Timestamp.now().year
+        d_so['TGL_FIFO'] = pd.Timestamp(year=int(ref_y)-1, month=12, day=31)
+        d_so['QTY_FIFO'] = pd.to_numeric(d_so[m['q_so']]).fillna(0)
+        d_so['PRC_FIFO'] = pd.to_numeric(d_so[m['h_so']]).fillna(0)
+        d_so['SOURCE'] = 0
+    else: d_so = pd.DataFrame()
+
+    inv_merged = pd.concat([d_so, d_in], ignore_index=True).sort_values(['TGL_FIFO', 'SOURCE'])
+
+    d_out = df_out_raw.copy()
+    d_out['TGL_FIFO'] = pd.to_datetime(d_out[m['t_out']])
+    d_out['QTY_FIFO'] = pd.to_numeric(d_out[m['q_out']]).fillna(0)
+    d_out = d_out.sort_values(by=['TGL_FIFO'], kind='stable').reset_index(drop=True)
+
+    def ambil_opt(row, kolom):
+        return {oc['label']: pd.NA if kolom(oc) == "-" else row.get(kolom(oc), pd.NA) for oc in opt_configs}
+
+    hasil = []
+    kolom_produk = m['p_in'] if not d_in.empty else m['p_so']
+    prod_keys = set(inv_merged[kolom_produk].unique()).union(set(d_out[m['p_out']].unique()))
+    for kode in prod_keys:
+        if pd.isna(kode) or kode == "-": continue
+
+        stok_antrean = []
+        masuk_produk = inv_merged[inv_merged[kolom_produk] == kode].to_dict('records')
+        keluar_produk = d_out[d_out[m['p_out']] == kode].to_dict('records')
+
+        for r in masuk_produk:
+            opt = ambil_opt(r, lambda oc: oc['so'] if r['SOURCE'] == 0 else oc['in'])
+            stok_antrean.append({'qty': r['QTY_FIFO'], 'prc': r['PRC_FIFO'], 'opt': opt})
+            hasil.append({'Tanggal': r['TGL_FIFO'], 'Produk': kode, **opt,
+                          'Qty Masuk': r['QTY_FIFO'], 'Harga Satuan Masuk': r['PRC_FIFO'],
+                          'Total Masuk': r['QTY_FIFO'] * r['PRC_FIFO'],
+                          'Qty Keluar': 0, 'Harga Satuan Keluar': 0, 'Total Keluar': 0, 'Keterangan': 'BARANG MASUK'})
+
+        for k in keluar_produk:
+            qty_perlu = k['QTY_FIFO']
+            opt_keluar = ambil_opt(k, lambda oc: oc['out'])
+            while qty_perlu > 0:
+                if not stok_antrean:
+                    hasil.append({'Tanggal': k['TGL_FIFO'], 'Produk': kode, **opt_keluar,
+                                  'Qty Masuk': 0, 'Harga Satuan Masuk': 0, 'Total Masuk': 0,
+                                  'Qty Keluar': qty_perlu, 'Harga Satuan Keluar': 0, 'Total Keluar': 0,
+                                  'Keterangan': 'OUT OF STOCK'})
+                    qty_perlu = 0
+                else:
+                    stok_skrg = stok_antrean[0]
+                    if stok_skrg['qty'] <= qty_perlu:
+                        ambil = stok_skrg['qty']; qty_perlu -= ambil
+                        stok_antrean.pop(0)
+                    else:
+                        ambil = qty_perlu; qty_perlu = 0
+                        stok_skrg['qty'] -= ambil
+                    hna = stok_skrg['prc']
+                    hasil.append({'Tanggal': k['TGL_FIFO'], 'Produk': kode, **opt_keluar,
+                                  'Qty Masuk': 0, 'Harga Satuan Masuk': 0, 'Total Masuk': 0,
+                                  'Qty Keluar': ambil, 'Harga Satuan Keluar': hna, 'Total Keluar': ambil * hna,
+                                  'Keterangan': 'BARANG KELUAR'})
+
+    df_final = pd.DataFrame(hasil)
+    if not df_final.empty:
+        df_final = df_final.sort_values(by=['Produk', 'Tanggal']).reset_index(drop=True)
+        df_final['Stok'] = df_final.groupby('Produk')['Qty Masuk'].cumsum() - df_final.groupby('Produk')['Qty Keluar'].cumsum()
+        df_final['Nilai Stok'] = df_final.groupby('Produk')['Total Masuk'].cumsum() - df_final.groupby('Produk')['Total Keluar'].cumsum()
+        is_last = df_final.groupby('Produk').cumcount(ascending=False) == 0
+        oos = df_final['Keterangan'] == 'OUT OF STOCK'
+        df_final.loc[is_last & oos, 'Keterangan'] = 'STOK SEKARANG (OUT OF STOCK)'
+        df_final.loc[is_last & ~oos, 'Keterangan'] = 'STOK SEKARANG'
+    return df_final
+
+
+def buat_data(seed, so=True, masuk=True, n_prod=12, n_in=80, n_out=160, jenis_tanggal='timestamp'):
+    """Data campuran: produk '-' / kosong, produk yang hanya ada di Keluar, banyak Keluar di tanggal sama, OOS."""
+    r = random.Random(seed)
+    prods = [f"P{i:02d}" for i in range(n_prod)]
+    awal = pd.Timestamp('2024-01-01')
+
+    def tgl(n):
+        hasil = [awal + pd.Timedelta(days=r.randint(0, 20)) for _ in range(n)]
+        return [t.date() for t in hasil] if jenis_tanggal == 'date' else hasil
+
+    df_so = pd.DataFrame({
+        'Kode': [r.choice(prods + ['-']) for _ in range(n_prod)],
+        'Qty': [r.randint(0, 20) for _ in range(n_prod)],
+        'Harga': [r.choice([1000.0, 1500.5, 2000.0]) for _ in range(n_prod)],
+        'Lok': [r.choice(['A', 'B']) for _ in range(n_prod)],
+    }) if so else None
+    df_in = pd.DataFrame({
+        'Tgl': tgl(n_in),
+        'Kode': [r.choice(prods + ['-']) for _ in range(n_in)],
+        'Qty': [float(r.randint(1, 15)) for _ in range(n_in)],
+        'Harga': [float(r.randint(900, 2100)) for _ in range(n_in)],
+        'Sup': [r.choice(['S1', 'S2', None]) for _ in range(n_in)],
+    }) if masuk else None
+    df_out = pd.DataFrame({
+        'Tanggal': tgl(n_out),
+        'Barang': [r.choice(prods + ['HANYA-KELUAR', '-', None]) for _ in range(n_out)],
+        'Jml': [float(r.randint(0, 25)) for _ in range(n_out)],
+        'Cust': [f"C{i}" for i in range(n_out)],
+    })
+    return df_so, df_in, df_out
+
+
+def samakan(lama, baru):
+    assert list(baru.columns) == list(lama.columns)
+    assert len(baru) == len(lama)
+    for col in lama.columns:
+        a, b = lama[col], baru[col]
+        if col == 'Tanggal':
+            assert (pd.to_datetime(a).to_numpy() == pd.to_datetime(b).to_numpy()).all()
+        elif pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            np.testing.assert_array_equal(b.to_numpy(dtype=float), a.to_numpy(dtype=float), err_msg=col)
+        else:
+            nilai = lambda s: s.astype(object).where(s.notna(), None).tolist()
+            assert nilai(b) == nilai(a), col
+
+
+@pytest.mark.parametrize('so, masuk', [(True, True), (True, False), (False, True)], ids=['so+masuk', 'so', 'masuk'])
+@pytest.mark.parametrize('seed', range(4))
+def test_ledger_sama_dengan_loop_lama(seed, so, masuk):
+    data = buat_data(seed, so=so, masuk=masuk)
+    lama = run_fifo_lama(*data, MAPPING, OPT_CONFIGS)
+    baru = run_fifo(*data, MAPPING, OPT_CONFIGS)
+    # OUT OF STOCK di periode 2 sendiri tetap sama
+    assert (lama['Keterangan'] == 'OUT OF STOCK').any()
+    assert 'HANYA-KELUAR' in set(lama['Produk'])
+    samakan(lama, baru)
+
+
+def test_kolom_tanggal_date_sama_dengan_loop_lama():
+    data = buat_data(7, jenis_tanggal='date')
+    samakan(run_fifo_lama(*data, MAPPING, OPT_CONFIGS), run_fifo(*data, MAPPING, OPT_CONFIGS))
+
+
+def test_keluar_tanggal_sama_diproses_sesuai_urutan_file():
+    masuk = pd.DataFrame({'Tgl': [datetime.date(2024, 1, 1)] * 2, 'Kode': ['A', 'A'],
+                          'Qty': [5.0, 5.0], 'Harga': [100.0, 200.0], 'Sup': ['S1', 'S2']})
+    keluar = pd.DataFrame({'Tanggal': [datetime.date(2024, 1, 2)] * 3, 'Barang': ['A'] * 3,
+                           'Jml': [4.0, 3.0, 5.0], 'Cust': ['C1', 'C2', 'C3']})
+    df = run_fifo(None, masuk, keluar, MAPPING, OPT_CONFIGS[:1])
+    df = df[df['Qty Keluar'] > 0]
+    # 4 + 3 + 5 = 12 dari stok 10: C1 & C2 memakai lot 100 dulu, sisa C3 tercatat OUT OF STOCK
+    assert df['Info'].tolist() == ['C1', 'C2', 'C2', 'C3', 'C3']
+    assert df['Qty Keluar'].tolist() == [4.0, 1.0, 2.0, 3.0, 2.0]
+    assert df['Harga Satuan Keluar'].tolist() == [100.0, 100.0, 200.0, 200.0, 0.0]
+    assert df['Keterangan'].astype(str).tolist()[-2:] == ['BARANG KELUAR', 'STOK SEKARANG (OUT OF STOCK)']
+    assert df['Stok'].tolist()[-1] == -2.0
+
+
+MAPPING_MASUK = {**MAPPING, 'p_so': '-', 'q_so': '-', 'h_so': '-'}
+
+
+def _transaksi_bulan(r, bulan, n_masuk, n_keluar, prods):
+    awal = pd.Timestamp(2024, bulan, 1)
+    tgl = lambda n: [awal + pd.Timedelta(days=r.randint(0, 27)) for _ in range(n)]
+    masuk = pd.DataFrame({'Tgl': tgl(n_masuk), 'Kode': [r.choice(prods) for _ in range(n_masuk)],
+                          'Qty': [float(r.randint(5, 30)) for _ in range(n_masuk)],
+                          'Harga': [float(r.randint(900, 1100)) for _ in range(n_masuk)],
+                          'Sup': [f"S{bulan}{r.randint(0, 3)}" for _ in range(n_masuk)]})
+    keluar = pd.DataFrame({'Tanggal': tgl(n_keluar), 'Barang': [r.choice(prods) for _ in range(n_keluar)],
+                           'Jml': [float(r.randint(1, 8)) for _ in range(n_keluar)],
+                           'Cust': [f"C{bulan}{i}" for i in range(n_keluar)]})
+    return masuk, keluar
+
+
+def _lewat_parquet(df, tmp_path):
+    path = tmp_path / "fifo_snapshot.parquet"
+    tulis_parquet(df, str(path))
+    return pd.read_parquet(path)
+
+
+def test_snapshot_dua_periode_sama_dengan_seluruh_histori(tmp_path):
+    r = random.Random(5)
+    prods = [f"P{i}" for i in range(15)]
+    masuk1, keluar1 = _transaksi_bulan(r, 1, 150, 100, prods)
+    masuk2, keluar2 = _transaksi_bulan(r, 2, 50, 800, prods)
+    oc = OPT_CONFIGS[:1]
+
+    penuh, sisa_penuh = run_fifo_lengkap(None, pd.concat([masuk1, masuk2]), pd.concat([keluar1, keluar2]),
+                                         MAPPING_MASUK, oc)
+    ledger1, snapshot = run_fifo_lengkap(None, masuk1, keluar1, MAPPING_MASUK, oc)
+    assert not ledger1['Keterangan'].astype(str).str.contains('OUT OF STOCK').any()
+    ledger2, sisa2 = run_fifo_lengkap(None, masuk2, keluar2, MAPPING_MASUK, oc,
+                                      snapshot=_lewat_parquet(snapshot, tmp_path))
+
+    pd.testing.assert_frame_equal(sisa2, sisa_penuh, check_dtype=False)
+    assert (ledger2['Keterangan'] == 'SALDO AWAL').sum() == len(snapshot)
+    # Baris periode 2 (termasuk Stok / Nilai Stok berjalan) sama dengan run seluruh histori
+    feb = lambda df: df[(df['Tanggal'] >= '2024-02-01') & (df['Keterangan'] != 'SALDO AWAL')].reset_index(drop=True)
+    baru, lama = feb(ledger2), feb(penuh)
+    # OUT OF STOCK di periode 2 sendiri tetap sama
+    assert (lama['Keterangan'] == 'OUT OF STOCK').any()
+    pd.testing.assert_frame_equal(baru.drop(columns=['Nilai Stok']), lama.drop(columns=['Nilai Stok']), check_dtype=False)
+    np.testing.assert_allclose(baru['Nilai Stok'], lama['Nilai Stok'], rtol=1e-9)
+
+
+def test_snapshot_tidak_mengisi_ulang_out_of_stock_periode_lalu():
+    # Januari: keluar 8 dari stok 5 -> 3 OUT OF STOCK. Februari: masuk 10.
+    masuk1 = pd.DataFrame({'Tgl': [pd.Timestamp('2024-01-02')], 'Kode': ['A'], 'Qty': [5.0], 'Harga': [100.0],
+                           'Sup': ['S1']})
+    keluar1 = pd.DataFrame({'Tanggal': [pd.Timestamp('2024-01-10')], 'Barang': ['A'], 'Jml': [8.0], 'Cust': ['C1']})
+    masuk2 = pd.DataFrame({'Tgl': [pd.Timestamp('2024-02-01')], 'Kode': ['A'], 'Qty': [10.0], 'Harga': [200.0],
+                           'Sup': ['S2']})
+    keluar2 = pd.DataFrame({'Tanggal': [pd.Timestamp('2024-02-05')], 'Barang': ['A'], 'Jml': [2.0], 'Cust': ['C2']})
+    oc = OPT_CONFIGS[:1]
+
+    # Seluruh histori: semua lot masuk antre dulu, jadi keluar Januari ikut memakai lot Februari
+    penuh = run_fifo(None, pd.concat([masuk1, masuk2]), pd.concat([keluar1, keluar2]), MAPPING_MASUK, oc)
+    assert not penuh['Keterangan'].astype(str).str.contains('OUT OF STOCK').any()
+    assert penuh['Stok'].iloc[-1] == 5.0
+    assert penuh['Nilai Stok'].iloc[-1] == 5 * 200.0
+
+    # Per periode: OUT OF STOCK tetap di Januari, lot Februari utuh untuk keluar Februari
+    ledger1, snapshot = run_fifo_lengkap(None, masuk1, keluar1, MAPPING_MASUK, oc)
+    assert ledger1['Keterangan'].astype(str).tolist() == ['BARANG MASUK', 'BARANG KELUAR', 'STOK SEKARANG (OUT OF STOCK)']
+    assert snapshot.empty
+    ledger2 = run_fifo(None, masuk2, keluar2, MAPPING_MASUK, oc, snapshot=snapshot)
+    assert ledger2['Harga Satuan Keluar'].tolist() == [0.0, 200.0]
+    assert ledger2['Stok'].iloc[-1] == 8.0
+    assert ledger2['Nilai Stok'].iloc[-1] == 8 * 200.0
+
+
+def test_ledger_ringkas_lengkap_sama_dengan_ledger_penuh():
+    df_so, df_in, df_out = buat_data(3, n_in=200)
+    df_in['Gudang'] = [f"G{i % 3}" for i in range(len(df_in))]
+    df_out['Tgl Kirim'] = df_out['Tanggal']
+    # Kolom kategori (Gudang), tanggal, label kembar, dan label yang sama dengan kolom ledger
+    opt_configs = OPT_CONFIGS + [{'label': 'Gudang', 'so': 'Lok', 'in': 'Gudang', 'out': '-'},
+                                 {'label': 'Kirim', 'so': '-', 'in': '-', 'out': 'Tgl Kirim'},
+                                 {'label': 'Keterangan', 'so': 'Lok', 'in': 'Sup', 'out': 'Cust'}]
+    ledger, _ = run_fifo_ringkas(df_so, df_in, df_out, MAPPING, opt_configs)
+    assert KOLOM_REF in ledger.df.columns and 'Info' not in ledger.df.columns
+    assert isinstance(ledger.opsional['Gudang'].dtype, pd.CategoricalDtype)
+
+    penuh = ledger.lengkap()
+    samakan(run_fifo_lama(df_so, df_in, df_out, MAPPING, opt_configs), penuh)
+
+    # Potongan (halaman / hasil filter) dilengkapi sama dengan baris yang sama di ledger penuh
+    for potongan in (ledger.df.iloc[50:75], ledger.df[ledger.df['Produk'] == 'P03'], ledger.df.iloc[:0]):
+        hasil = ledger.lengkap(potongan)
+        assert list(hasil.columns) == list(penuh.columns)
+        pd.testing.assert_frame_equal(hasil, penuh.loc[potongan.index], check_dtype=False)
@@ -0,0 +1,38 @@
+"""Filter produk / tanggal saat membaca Penyimpanan Data, untuk berbagai tipe kolom Parquet."""
+import datetime
+
+import pandas as pd
+import pytest
+
+from penyimpanan import PenyimpananData
+
+TANGGAL = ["28/02/2024", "05/03/2024", "31/03/2024", "15/04/2024"]
+
+
+@pytest.fixture
+def penyimpanan(tmp_path):
+    return PenyimpananData(str(tmp_path))
+
+
+def _simpan(penyimpanan, tgl, kode):
+    penyimpanan.simpan("Keluar", "2024-03", pd.DataFrame({'Kode': kode, 'Tgl': tgl, 'Qty': [1, 2, 3, 4]}))
+
+
+@pytest.mark.parametrize('tgl', [
+    TANGGAL,
+    pd.to_datetime(TANGGAL, format='%d/%m/%Y') + pd.Timedelta(hours=10),
+    [d.date() for d in pd.to_datetime(TANGGAL, format='%d/%m/%Y')],
+], ids=['teks', 'datetime', 'date'])
+def test_batas_tanggal_sesuai_tanggal_bukan_teks(penyimpanan, tgl):
+    _simpan(penyimpanan, tgl, ["A", "B", "C", "D"])
+    df = penyimpanan.baca("Keluar", "2024-03", kolom=['Kode', 'Qty'],
+                          rentang=('Tgl', datetime.date(2024, 3, 1), datetime.date(2024, 3, 31)))
+    assert df['Kode'].tolist() == ["B", "C"]
+    assert list(df.columns) == ['Kode', 'Qty']
+
+
+def test_kode_produk_yang_tidak_cocok_tipe_kolom_dilewati(penyimpanan):
+    _simpan(penyimpanan, TANGGAL, [1, 2, 3, 4])
+    df = penyimpanan.baca("Keluar", "2024-03", produk=('Kode', ["BRG-1", "2", 3]))
+    assert df['Kode'].tolist() == [2, 3]
+    assert penyimpanan.baca("Keluar", "2024-03", produk=('Kode', ["BRG-1"])).empty
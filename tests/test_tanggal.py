@@ -0,0 +1,76 @@
+"""Parsing kolom tanggal: urutan hari-bulan, nama bulan Indonesia, nomor seri Excel, format per kolom lintas chunk."""
+import datetime
+
+import pandas as pd
+import pytest
+
+from tanggal import ParserTanggal, parse_tanggal, pastikan_tanggal
+
+T = pd.Timestamp
+
+
+def _parse(nilai, **kwargs):
+    return parse_tanggal(pd.Series(nilai, dtype=object), **kwargs).tolist()
+
+
+@pytest.mark.parametrize('nilai, harapan', [
+    # Hari lebih dulu (gaya Indonesia)
+    (["05/03/2024", "31/12/2023 10:30"], [T('2024-03-05'), T('2023-12-31 10:30')]),
+    (["01/02/2024", "03/04/2024"], [T('2024-02-01'), T('2024-04-03')]),
+    (["05-03-2024", "2024-03-05"], [T('2024-03-05'), T('2024-03-05')]),
+    # Bulan-hari hanya jika kolomnya jelas bulan-hari (ada 31 di posisi kedua)
+    (["12/31/2024", "01/02/2024"], [T('2024-12-31'), T('2024-01-02')]),
+    # Nama bulan / hari Indonesia
+    (["5 Maret 2024", "05-Agu-2024", "Senin, 5 Februari 2024", "17 Mei 2024 10:30", "1 Desember 2023"],
+     [T('2024-03-05'), T('2024-08-05'), T('2024-02-05'), T('2024-05-17 10:30'), T('2023-12-01')]),
+    # Nomor seri Excel (angka atau teks angka)
+    ([45292, 45292.5], [T('2024-01-01'), T('2024-01-01 12:00')]),
+    (["45292", "45292.5"], [T('2024-01-01'), T('2024-01-01 12:00')]),
+    # Angka di atas rentang seri dibaca sebagai yyyymmdd
+    (["20240131"], [T('2024-01-31')]),
+    ([20240131, 45292], [T('2024-01-31'), T('2024-01-01')]),
+    # Campuran dengan baris teks (TOTAL), kosong dan boolean
+    ([45292, "TOTAL", "05/03/2024", "", None, True], [T('2024-01-01'), pd.NaT, T('2024-03-05'), pd.NaT, pd.NaT, pd.NaT]),
+], ids=['hari-bulan', 'hari-bulan-ambigu', 'strip-dan-iso', 'bulan-hari', 'nama-bulan', 'serial', 'serial-teks',
+        'yyyymmdd-teks', 'yyyymmdd-angka', 'campuran'])
+def test_parse_tanggal(nilai, harapan):
+    hasil = _parse(nilai)
+    assert [None if pd.isna(v) else v for v in hasil] == [None if pd.isna(v) else v for v in harapan]
+
+
+def test_format_kolom_dipakai_untuk_chunk_berikutnya():
+    parser = ParserTanggal()
+    assert parse_tanggal(pd.Series(["12/31/2024"]), parser).tolist() == [T('2024-12-31')]
+    assert parser.format == '%m/%d/%Y'
+    # Chunk kedua ambigu: tetap bulan-hari mengikuti chunk pertama
+    assert parse_tanggal(pd.Series(["01/02/2024"]), parser).tolist() == [T('2024-01-02')]
+    assert parse_tanggal(pd.Series(["01/02/2024"])).tolist() == [T('2024-02-01')]
+
+
+def test_hanya_tanggal():
+    hasil = _parse(["05/03/2024 10:30", "45292", None, ""], hanya_tanggal=True)
+    assert hasil[:2] == [datetime.date(2024, 3, 5), datetime.date(2024, 1, 1)]
+    assert all(isinstance(v, datetime.date) and not isinstance(v, datetime.datetime) for v in hasil[:2])
+    assert pd.isna(hasil[2]) and pd.isna(hasil[3])
+
+
+def test_boolean_bukan_nomor_seri():
+    assert parse_tanggal(pd.Series([True, False])).isna().all()
+    assert parse_tanggal(pd.Series(pd.array([True, None], dtype='boolean'))).isna().all()
+
+
+def test_pastikan_tanggal_menolak_teks_bukan_tanggal():
+    with pytest.raises(ValueError, match="'TOTAL' di kolom Tgl"):
+        pastikan_tanggal(pd.Series(["05/03/2024", "TOTAL"], name='Tgl'))
+    # Sel kosong tetap diterima (NaT)
+    hasil = pastikan_tanggal(pd.Series(["05/03/2024", "", None]))
+    assert hasil.iloc[0] == T('2024-03-05') and hasil.iloc[1:].isna().all()
+
+
+def test_pastikan_tanggal_kolom_date_dan_datetime():
+    kolom_date = parse_tanggal(pd.Series(["05/03/2024", "06/03/2024"]), hanya_tanggal=True)
+    hasil = pastikan_tanggal(kolom_date)
+    assert pd.api.types.is_datetime64_any_dtype(hasil)
+    assert hasil.tolist() == [T('2024-03-05'), T('2024-03-06')]
+    sudah = pd.Series(pd.to_datetime(["2024-03-05"]))
+    assert pastikan_tanggal(sudah) is sudah